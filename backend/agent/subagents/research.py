@@ -10,6 +10,7 @@ found through the APIs.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -28,15 +29,21 @@ from agent.subagents.base import (
 from agent.providers.colorist import get_haiku_model
 from agent.vibe_state import VibeResearchState, ResearchPhase
 from agent.tools.citation_management.citation_api import (
+    ArxivClient,
     PubMedClient,
     GoogleScholarClient,
     MetadataExtractor,
     format_results,
+    make_citation_http_client,
 )
 from services.semantic_scholar import SemanticScholarClient
 
 logger = logging.getLogger(__name__)
 
+# Blocking web searches (DDGS) run on their own small pool so they neither
+# spin up a fresh pool per call nor queue behind other default-executor work
+_WEB_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="web-search")
+
 
 # =============================================================================
 # Mode and Dependencies
@@ -112,7 +119,6 @@ async def search_web_for_papers(
         List of paper dictionaries with title, url, snippet, source
     """
     import asyncio
-    from concurrent.futures import ThreadPoolExecutor
 
     def _sync_search():
         from ddgs import DDGS
@@ -175,9 +181,8 @@ async def search_web_for_papers(
         return results
 
     # Run synchronous search in thread pool to not block event loop
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as executor:
-        results = await loop.run_in_executor(executor, _sync_search)
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(_WEB_SEARCH_EXECUTOR, _sync_search)
 
     return results
 
@@ -734,10 +739,7 @@ class ResearchAgent(Subagent[ResearchDeps]):
     def _get_http_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client."""
         if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(
-                timeout=httpx.Timeout(30.0, connect=5.0),
-                follow_redirects=True,
-            )
+            self._http_client = make_citation_http_client()
         return self._http_client
 
     def _get_s2_client(self) -> SemanticScholarClient:
@@ -1494,7 +1496,7 @@ Proceed with broad search across all venues."""
             Extracts full metadata for generating BibTeX entries.
 
             Args:
-                identifier: DOI (10.xxxx/...), PMID (8+ digits), or paper URL
+                identifier: DOI (10.xxxx/...), PMID (8+ digits), arXiv ID, or paper URL
 
             Returns:
                 Citation metadata including title, authors, year, venue
@@ -1505,7 +1507,10 @@ Proceed with broad search across all venues."""
                 ctx.deps.vibe_state.save(ctx.deps.project_path)
 
             try:
-                extractor = MetadataExtractor(ctx.deps.http_client)
+                extractor = MetadataExtractor(
+                    ctx.deps.http_client,
+                    arxiv_lookup=ArxivClient(ctx.deps.http_client).lookup_id,
+                )
                 id_type, cleaned_id = extractor.identify_type(identifier)
 
                 if id_type == "unknown":
@@ -0,0 +1,205 @@
+"""
+BibTeX scanning and value escaping shared by the citation management scripts.
+
+A brace-aware scanner over BibTeX text: values with nested braces are kept
+whole, and an entry with unbalanced braces or quotes is reported instead of
+absorbing the entries after it. to_bibtex_value prepares API metadata for
+writing into an entry.
+"""
+
+import html
+import re
+
+# Scanner tokens: entry header, field name (after separators), bare value,
+# and the characters that open/close/escape a braced or quoted value
+_ENTRY_HEAD_RE = re.compile(r"@(\w+)\s*\{")
+_FIELD_HEAD_RE = re.compile(r"[\s,]*(?:(\w+)\s*=\s*)?")
+_BARE_VALUE_RE = re.compile(r"[^,}]*")
+_DELIMITER_RE = re.compile(r'[{}"\\]')
+_NON_ENTRY_TYPES = {"comment", "preamble", "string"}
+# A line opening a new block; no entry extends past one
+_NEXT_ENTRY_RE = re.compile(r"\n[ \t]*@\w+\s*\{")
+
+# Characters read per block when streaming a .bib file
+READ_BLOCK_SIZE = 1 << 20
+
+
+def _value_end(text: str, pos: int) -> int:
+    """
+    Find the end of the {...} or "..." group opening at text[pos].
+
+    Braces nest, backslash escapes the next character, and a quote only
+    closes a quoted group at brace depth 0.
+
+    Returns:
+        Index just past the closing delimiter, or -1 if the group is unterminated
+    """
+    quoted = text[pos] == '"'
+
+    # Fast path: a flat value with nothing to nest or escape
+    close = text.find('"' if quoted else "}", pos + 1)
+    if close >= 0:
+        inner = text[pos + 1 : close]
+        if "{" not in inner and "}" not in inner and "\\" not in inner:
+            return close + 1
+
+    depth = 0 if quoted else 1
+    search = _DELIMITER_RE.search
+    pos += 1
+    while True:
+        match = search(text, pos)
+        if match is None:
+            return -1
+        char = match.group()
+        pos = match.end()
+        if char == "\\":
+            pos += 1
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0 and not quoted:
+                return pos
+        elif quoted and depth == 0:
+            return pos
+
+
+def scan_entries(content: str, final: bool = True):
+    """
+    Yield (type, key, fields, start, end) for each entry in a BibTeX string.
+
+    A single forward pass: find "@", read the type up to "{" and the key up
+    to ",", then scan fields until the brace that closes the entry.
+    @string, @comment and @preamble blocks, and blocks without a "key,"
+    header, are skipped. content[start:end] is the entry's text and `end`
+    is where a streaming caller can resume.
+
+    An entry whose braces or quotes do not balance before the next line
+    opening a block (or, when `final`, before the end of input) is yielded
+    with fields=None rather than absorbing what follows. Without `final`,
+    scanning stops at an unterminated entry that may still be completed by
+    more input.
+    """
+    pos = 0
+    while True:
+        at = content.find("@", pos)
+        if at < 0:
+            return
+        head = _ENTRY_HEAD_RE.match(content, at)
+        if head is None:
+            pos = at + 1
+            continue
+
+        boundary = _NEXT_ENTRY_RE.search(content, head.end())
+        limit = boundary.start() if boundary else len(content) if final else -1
+
+        entry_type = head.group(1).lower()
+        comma = content.find(",", head.end())
+        key = content[head.end() : comma].strip()
+        # Keys are a single token; anything else is not an entry header
+        if entry_type in _NON_ENTRY_TYPES or comma < 0 or "}" in key or len(key.split()) != 1:
+            pos = _value_end(content, head.end() - 1)
+            if pos < 0 or limit >= 0 and pos > limit:
+                if limit < 0:
+                    return
+                pos = limit
+            continue
+
+        fields, pos = _scan_fields(content, comma + 1)
+        if pos < 0 or limit >= 0 and pos > limit:
+            if limit < 0:
+                return  # unterminated entry may continue in the next block
+            yield entry_type, key, None, at, limit
+            pos = limit
+            continue
+        yield entry_type, key, fields, at, pos
+
+
+def _scan_fields(text: str, pos: int) -> tuple[dict, int]:
+    """
+    Parse `name = {value}` / `name = "value"` pairs starting at text[pos].
+
+    Returns:
+        Tuple of (fields, index just past the entry's closing brace, or -1)
+    """
+    fields = {}
+    length = len(text)
+    while True:
+        head = _FIELD_HEAD_RE.match(text, pos)
+        start = head.end()
+        if start >= length:
+            return fields, -1
+
+        char = text[start]
+        if char == "}" and head.group(1) is None:
+            return fields, start + 1
+
+        if char in '{"':
+            end = _value_end(text, start)
+            if end < 0:
+                return fields, -1
+            if head.group(1):
+                fields[head.group(1).lower()] = text[start + 1 : end - 1].strip()
+            pos = end
+        else:
+            # Bare values (numbers, @string macros) are not kept
+            pos = _BARE_VALUE_RE.match(text, start).end()
+            if pos == start:
+                pos += 1
+
+
+def read_entries(filepath: str):
+    """
+    Stream (type, key, fields, text) for each entry in a BibTeX file.
+
+    The file is read in READ_BLOCK_SIZE blocks and each entry is yielded
+    once its closing brace has been read, so memory is bounded by the
+    largest entry rather than the file. `text` is the entry as written;
+    fields is None for a malformed entry (see scan_entries).
+    """
+    buffer = ""
+    with open(filepath, encoding="utf-8") as f:
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            buffer += block
+
+            done = 0
+            for entry_type, key, fields, start, end in scan_entries(buffer, final=not block):
+                yield entry_type, key, fields, buffer[start:end].rstrip()
+                done = end
+            if not block:
+                return
+            # Keep only a possibly incomplete trailing entry
+            buffer = buffer[done:]
+            if "@" not in buffer:
+                buffer = ""
+
+
+# Markup CrossRef leaves in titles and names (JATS such as <jats:italic>, or HTML)
+_MARKUP_TAG_RE = re.compile(r"</?[A-Za-z][\w:.-]*(?:\s[^<>]*)?/?>")
+# Characters LaTeX treats specially, with their escaped form
+_LATEX_ESCAPES = {
+    "\\": r"\textbackslash{}",
+    "{": r"\{",
+    "}": r"\}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_LATEX_SPECIAL_RE = re.compile("[" + re.escape("".join(_LATEX_ESCAPES)) + "]")
+
+
+def to_bibtex_value(text: str) -> str:
+    """
+    Make plain metadata text safe to write inside a {...} BibTeX value.
+
+    Markup tags are dropped, HTML entities decoded and whitespace collapsed,
+    then LaTeX special characters are escaped.
+    """
+    text = html.unescape(_MARKUP_TAG_RE.sub("", text))
+    text = " ".join(text.split())
+    return _LATEX_SPECIAL_RE.sub(lambda match: _LATEX_ESCAPES[match.group()], text)
@@ -0,0 +1,147 @@
+"""
+Shared helpers for the citation management scripts.
+
+HTTP/2 detection, request pacing and retries, streaming XML input and the
+atomic on-disk cache writes. Imported by the scripts both as part of the
+package and when they are run directly.
+"""
+
+import importlib.util
+import os
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Transient API errors are retried with exponential backoff
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5  # seconds; doubles per retry
+
+
+class ChunkReader:
+    """File-like read() over an iterator of byte chunks, for iterparse."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def read_cache(path: Path, ttl: float | None = None) -> bytes | None:
+    """Return a cache file's contents, or None if missing or older than ttl seconds."""
+    try:
+        if ttl is not None and time.time() - path.stat().st_mtime > ttl:
+            return None
+        return path.read_bytes()
+    except OSError:
+        return None
+
+
+def write_cache(path: Path, data: bytes) -> None:
+    """
+    Write a cache file atomically.
+
+    The data goes to a temporary file unique to this process and thread,
+    which then replaces path, so readers never see a partial record.
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class RequestPacer:
+    """
+    Per-host request pacing shared by worker threads.
+
+    Each host has a minimum interval between request starts, used until the
+    server advertises its own limit (CrossRef sends X-Rate-Limit-Limit/-Interval).
+    Hosts without an interval are not paced.
+    """
+
+    def __init__(self, intervals: dict[str, float]):
+        self.intervals = dict(intervals)
+        # Earliest monotonic time the next request to each host may start
+        self._next_ok: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait_turn(self, host: str) -> None:
+        """Sleep until the host's next free request slot."""
+        interval = self.intervals.get(host)
+        if not interval:
+            return
+        # Reserve a slot under the lock, sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_ok.get(host, now))
+            self._next_ok[host] = start + interval
+        if start > now:
+            time.sleep(start - now)
+
+    def update_rate_limit(self, host: str, headers) -> None:
+        """Derive the per-request interval from X-Rate-Limit headers, if present."""
+        limit = headers.get("X-Rate-Limit-Limit")
+        window = headers.get("X-Rate-Limit-Interval")  # e.g. "1s"
+        if not limit or not window:
+            return
+        try:
+            self.intervals[host] = float(window.rstrip("s")) / int(limit)
+        except (ValueError, ZeroDivisionError):
+            pass
+
+
+def send_with_retries(
+    client: httpx.Client, request: httpx.Request, pacer: RequestPacer | None = None, stream: bool = False
+) -> httpx.Response:
+    """
+    Send a request, retrying transport errors and RETRY_STATUSES.
+
+    Each attempt waits for the host's turn under pacer. Between retries the
+    server's Retry-After (in seconds) is honoured, otherwise the delay
+    doubles from BACKOFF_FACTOR. After MAX_RETRIES the last response is
+    returned whatever its status, and the last transport error is raised.
+    """
+    host = request.url.host
+    for attempt in range(MAX_RETRIES + 1):
+        if pacer is not None:
+            pacer.wait_turn(host)
+        try:
+            response = client.send(request, stream=stream)
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(BACKOFF_FACTOR * 2**attempt)
+            continue
+
+        if pacer is not None:
+            pacer.update_rate_limit(host, response.headers)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        response.close()
+        retry_after = response.headers.get("Retry-After", "")
+        time.sleep(float(retry_after) if retry_after.isdigit() else BACKOFF_FACTOR * 2**attempt)
@@ -6,15 +6,61 @@ Uses httpx.AsyncClient for all HTTP operations.
 """
 
 import asyncio
+import hashlib
+import importlib.util
+import json
 import os
 import re
+import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
-from typing import Optional
-from urllib.parse import urlparse
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
 
 import httpx
 
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_ARXIV_ID_RE = re.compile(r"^\d{4}\.\d{4,5}(v\d+)?$")
+_URL_HOST_RE = re.compile(r"^https?://([^/?#]+)([^?#]*)", re.IGNORECASE)
+_PUBMED_PATH_RE = re.compile(r"/(\d+)")
+_ARXIV_PATH_RE = re.compile(r"/abs/(\d{4}\.\d{4,5})")
+_DOI_IN_PATH_RE = re.compile(r"(10\.\d{4,}/[^\s?#]+)")
+_DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "doi:")
+
+# Bare identifier prefixes (lowercase) -> (type, number of chars to strip)
+_ID_PREFIXES = {
+    "10.": ("doi", 0),
+    "arxiv:": ("arxiv", 6),
+}
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+USER_AGENT = "Aura/1.0 (Citation Management)"
+
+# CrossRef date fields in order of preference ("published" is the newer
+# canonical field covering both print and online)
+_CROSSREF_DATE_FIELDS = ("published-print", "published-online", "published", "created")
+
+# Fields lookup_doi reads; `select` is only honoured on the /works list route
+_CROSSREF_SELECT = ",".join(("DOI", "title", "author", "container-title") + _CROSSREF_DATE_FIELDS)
+
+# Google Scholar is slow and aggressively rate limited, so search results
+# are memoized in-process and on disk
+_SCHOLAR_CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "aura" / "scholar"
+_SCHOLAR_CACHE_TTL = 24 * 3600  # seconds
+_SCHOLAR_MEMORY_CACHE_SIZE = 256
+
 
 # =============================================================================
 # Data Classes
@@ -36,19 +82,36 @@ class CitationMetadata:
     source: str = "unknown"
 
     def to_dict(self) -> dict:
-        return {
-            "title": self.title,
-            "authors": self.authors,
-            "year": self.year,
-            "venue": self.venue,
-            "doi": self.doi,
-            "pmid": self.pmid,
-            "arxiv_id": self.arxiv_id,
-            "url": self.url,
-            "abstract": self.abstract,
-            "citation_count": self.citation_count,
-            "source": self.source,
-        }
+        return {name: getattr(self, name) for name in _CITATION_FIELDS}
+
+
+# Computed once so to_dict stays in sync when fields are added
+_CITATION_FIELDS = tuple(f.name for f in fields(CitationMetadata))
+
+
+# =============================================================================
+# HTTP Client
+# =============================================================================
+
+def make_citation_http_client() -> httpx.AsyncClient:
+    """
+    Create an AsyncClient tuned for the citation APIs.
+
+    Keeps a warm keep-alive pool so repeated requests to CrossRef, NCBI and
+    OpenAlex skip the TCP/TLS handshake, and multiplexes concurrent requests
+    over HTTP/2 when h2 is installed.
+    """
+    return httpx.AsyncClient(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=30,
+            keepalive_expiry=30.0,
+        ),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+        headers={"User-Agent": USER_AGENT},
+        follow_redirects=True,
+    )
 
 
 # =============================================================================
@@ -60,12 +123,38 @@ class PubMedClient:
 
     BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
 
+    # Compiled XPath expressions, evaluated in libxml2 without materializing
+    # intermediate elements. string(...) yields "" when the node is missing.
+    if LET is not None:
+        _X_PMID = LET.XPath("string(MedlineCitation/PMID)")
+        _X_ARTICLE = LET.XPath("MedlineCitation/Article")
+        _X_TITLE = LET.XPath("string(ArticleTitle)")
+        _X_AUTHORS = LET.XPath("AuthorList/Author[LastName]")
+        _X_YEAR = LET.XPath("string((.//PubDate)[1]/Year)")
+        _X_JOURNAL = LET.XPath("string(.//Journal/Title)")
+        _X_ABSTRACT = LET.XPath("string(.//Abstract/AbstractText)")
+        _X_DOI = LET.XPath('string(.//ArticleId[@IdType="doi"])')
+
     def __init__(self, http_client: httpx.AsyncClient):
         self.http_client = http_client
         self.api_key = os.getenv("NCBI_API_KEY", "")
         self.email = os.getenv("NCBI_EMAIL", "")
         # Rate limiting: 10/sec with key, 3/sec without
         self.delay = 0.11 if self.api_key else 0.34
+        # Serializes this client's concurrent requests; created on first use
+        # so it belongs to the event loop the client runs in
+        self._ncbi_lock: Optional[asyncio.Lock] = None
+        self._ncbi_last_call = 0.0
+
+    async def _ncbi_gate(self) -> None:
+        """Wait only if the previous NCBI request was less than self.delay ago."""
+        if self._ncbi_lock is None:
+            self._ncbi_lock = asyncio.Lock()
+        async with self._ncbi_lock:
+            wait = self.delay - (time.monotonic() - self._ncbi_last_call)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._ncbi_last_call = time.monotonic()
 
     async def search(
         self,
@@ -106,6 +195,7 @@ class PubMedClient:
             params["api_key"] = self.api_key
 
         try:
+            await self._ncbi_gate()
             response = await self.http_client.get(
                 f"{self.BASE_URL}esearch.fcgi",
                 params=params,
@@ -119,7 +209,6 @@ class PubMedClient:
                 return []
 
             # Fetch metadata for PMIDs
-            await asyncio.sleep(self.delay)
             return await self._fetch_metadata(pmids)
 
         except Exception as e:
@@ -138,6 +227,7 @@ class PubMedClient:
             params["api_key"] = self.api_key
 
         try:
+            await self._ncbi_gate()
             response = await self.http_client.get(
                 f"{self.BASE_URL}efetch.fcgi",
                 params=params,
@@ -145,8 +235,9 @@ class PubMedClient:
             )
             response.raise_for_status()
 
-            # Parse XML
-            root = ET.fromstring(response.text)
+            # Parse the raw bytes; the XML declaration carries the encoding
+            parser = LET if LET is not None else ET
+            root = parser.fromstring(response.content)
             results = []
 
             for article in root.findall(".//PubmedArticle"):
@@ -161,6 +252,9 @@ class PubMedClient:
 
     def _parse_article(self, article: ET.Element) -> Optional[CitationMetadata]:
         """Parse a PubmedArticle XML element."""
+        if LET is not None:
+            return self._parse_article_xpath(article)
+
         try:
             medline = article.find(".//MedlineCitation")
             if medline is None:
@@ -175,9 +269,9 @@ class PubMedClient:
             if article_elem is None:
                 return None
 
-            # Title
+            # Title (itertext keeps text inside inline markup such as <i>)
             title_elem = article_elem.find("ArticleTitle")
-            title = title_elem.text if title_elem is not None else "Unknown"
+            title = "".join(title_elem.itertext()) if title_elem is not None else "Unknown"
 
             # Authors
             authors = []
@@ -210,7 +304,7 @@ class PubMedClient:
             abstract = None
             abstract_elem = article_elem.find(".//Abstract/AbstractText")
             if abstract_elem is not None:
-                abstract = abstract_elem.text
+                abstract = "".join(abstract_elem.itertext()) or None
 
             # DOI
             doi = None
@@ -234,6 +328,39 @@ class PubMedClient:
         except Exception:
             return None
 
+    def _parse_article_xpath(self, article) -> Optional[CitationMetadata]:
+        """Parse a PubmedArticle lxml element using the compiled XPaths."""
+        try:
+            article_nodes = self._X_ARTICLE(article)
+            if not article_nodes:
+                return None
+            article_elem = article_nodes[0]
+
+            pmid = self._X_PMID(article) or None
+
+            authors = []
+            for author in self._X_AUTHORS(article_elem):
+                last = author.findtext("LastName")
+                first = author.findtext("ForeName")
+                authors.append(f"{last}, {first}" if first is not None else last)
+
+            year_text = self._X_YEAR(article_elem)
+
+            return CitationMetadata(
+                title=self._X_TITLE(article_elem) or "Unknown",
+                authors=authors,
+                year=int(year_text) if year_text else None,
+                venue=self._X_JOURNAL(article_elem) or None,
+                doi=self._X_DOI(article) or None,
+                pmid=pmid,
+                url=f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else None,
+                abstract=self._X_ABSTRACT(article_elem) or None,
+                source="pubmed",
+            )
+
+        except Exception:
+            return None
+
 
 # =============================================================================
 # CrossRef API Client (for DOI lookup)
@@ -259,15 +386,23 @@ class CrossRefClient:
         """
         # Clean DOI
         doi = doi.strip()
-        if doi.startswith("https://doi.org/"):
-            doi = doi[16:]
-        elif doi.startswith("http://doi.org/"):
-            doi = doi[15:]
+        for prefix in _DOI_PREFIXES:
+            doi = doi.removeprefix(prefix)
 
         try:
+            # Query the list route filtered to this DOI so `select` can trim
+            # the record to the fields below (reference-heavy records are
+            # otherwise hundreds of KB). Commas would split the filter, so
+            # such DOIs use the singleton route.
+            if "," in doi:
+                url, params = f"{self.BASE_URL}/{doi}", None
+            else:
+                url, params = self.BASE_URL, {"filter": f"doi:{doi}", "rows": 1, "select": _CROSSREF_SELECT}
+
             response = await self.http_client.get(
-                f"{self.BASE_URL}/{doi}",
-                headers={"User-Agent": "Aura/1.0 (Citation Management)"},
+                url,
+                params=params,
+                headers={"User-Agent": USER_AGENT},
                 timeout=15.0,
             )
 
@@ -275,52 +410,55 @@ class CrossRefClient:
                 return None
 
             response.raise_for_status()
-            data = response.json()
+            # CrossRef records can be large (long author lists), so parse
+            # with orjson when it is installed
+            data = orjson.loads(response.content) if orjson is not None else response.json()
             message = data.get("message", {})
+            if params is not None:
+                items = message.get("items") or []
+                if not items:
+                    return None
+                message = items[0]
 
-            # Extract authors
-            authors = []
-            for author in message.get("author", []):
-                given = author.get("given", "")
-                family = author.get("family", "")
-                if family:
-                    authors.append(f"{family}, {given}".strip(", "))
-
-            # Extract year
-            year = None
-            if "published-print" in message:
-                parts = message["published-print"].get("date-parts", [[]])
-                if parts and parts[0]:
-                    year = parts[0][0]
-            elif "published-online" in message:
-                parts = message["published-online"].get("date-parts", [[]])
-                if parts and parts[0]:
-                    year = parts[0][0]
-            elif "created" in message:
-                parts = message["created"].get("date-parts", [[]])
-                if parts and parts[0]:
-                    year = parts[0][0]
+            return self._parse_work(message, doi)
 
-            # Extract title
-            title = message.get("title", ["Unknown"])[0]
+        except Exception as e:
+            raise RuntimeError(f"CrossRef lookup failed for {doi}: {e}")
 
-            # Extract venue
-            venue = None
-            if message.get("container-title"):
-                venue = message["container-title"][0]
+    def _parse_work(self, message: dict, doi: str) -> CitationMetadata:
+        """Build CitationMetadata from a CrossRef work record."""
+        # Extract authors
+        authors = [
+            f"{author['family']}, {author.get('given', '')}".strip(", ")
+            for author in message.get("author", ())
+            if author.get("family")
+        ]
+
+        # Extract year from the first date field that has one
+        year = None
+        for key in _CROSSREF_DATE_FIELDS:
+            date = message.get(key)
+            if date:
+                parts = date.get("date-parts")
+                if parts and parts[0] and parts[0][0]:
+                    year = parts[0][0]
+                    break
 
-            return CitationMetadata(
-                title=title,
-                authors=authors,
-                year=year,
-                venue=venue,
-                doi=doi,
-                url=f"https://doi.org/{doi}",
-                source="crossref",
-            )
+        # Extract title and venue (CrossRef sends lists, sometimes empty)
+        titles = message.get("title")
+        title = titles[0] if titles else "Unknown"
+        venues = message.get("container-title")
+        venue = venues[0] if venues else None
 
-        except Exception as e:
-            raise RuntimeError(f"CrossRef lookup failed for {doi}: {e}")
+        return CitationMetadata(
+            title=title,
+            authors=authors,
+            year=year,
+            venue=venue,
+            doi=doi,
+            url=f"https://doi.org/{doi}",
+            source="crossref",
+        )
 
 
 # =============================================================================
@@ -334,13 +472,65 @@ class GoogleScholarClient:
     _last_request_time: float = 0
     _min_request_interval: float = 2.0  # Minimum 2 seconds between requests
 
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+    }
+
+    # Search results keyed by cache key -> (fetch time, list of to_dict() rows)
+    _result_cache: dict[str, tuple[float, list[dict]]] = {}
+
     def __init__(self, http_client: httpx.AsyncClient):
         self.http_client = http_client
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-        }
+
+    @staticmethod
+    def _cache_key(query: str, max_results: int, year_start: Optional[int], year_end: Optional[int]) -> str:
+        """Stable cache key for a set of search parameters."""
+        params = json.dumps([query, max_results, year_start, year_end])
+        return hashlib.sha1(params.encode()).hexdigest()
+
+    @classmethod
+    def _cache_get(cls, key: str) -> Optional[list[CitationMetadata]]:
+        """Return cached search results, or None if missing or expired."""
+        now = time.time()
+        entry = cls._result_cache.get(key)
+        if entry is None:
+            path = _SCHOLAR_CACHE_DIR / f"{key}.json"
+            try:
+                entry = (path.stat().st_mtime, json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                return None
+        fetched_at, rows = entry
+        if now - fetched_at > _SCHOLAR_CACHE_TTL:
+            cls._result_cache.pop(key, None)
+            return None
+        cls._remember(key, entry)
+        return [CitationMetadata(**row) for row in rows]
+
+    @classmethod
+    def _cache_put(cls, key: str, results: list[CitationMetadata]) -> None:
+        """Store search results in memory and on disk (best effort, atomic)."""
+        rows = [paper.to_dict() for paper in results]
+        cls._remember(key, (time.time(), rows))
+
+        path = _SCHOLAR_CACHE_DIR / f"{key}.json"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            _SCHOLAR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(rows), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    @classmethod
+    def _remember(cls, key: str, entry: tuple[float, list[dict]]) -> None:
+        """Insert into the in-memory cache, evicting the least recently used."""
+        cache = cls._result_cache
+        cache.pop(key, None)
+        cache[key] = entry
+        if len(cache) > _SCHOLAR_MEMORY_CACHE_SIZE:
+            del cache[next(iter(cache))]
 
     async def search(
         self,
@@ -369,6 +559,11 @@ class GoogleScholarClient:
         except ImportError:
             raise ImportError("beautifulsoup4 required. Install with: pip install beautifulsoup4")
 
+        cache_key = self._cache_key(query, max_results, year_start, year_end)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         # Rate limiting: wait if needed
         current_time = time.time()
         time_since_last = current_time - GoogleScholarClient._last_request_time
@@ -385,17 +580,17 @@ class GoogleScholarClient:
             url += f"&as_yhi={year_end}"
 
         try:
-            response = await self.http_client.get(
-                url,
-                headers=self.headers,
-                follow_redirects=True,
-                timeout=30.0,
-            )
+            response = await self.http_client.get(url, headers=self.HEADERS, follow_redirects=True, timeout=30.0)
 
             if response.status_code != 200:
                 raise RuntimeError(f"Google Scholar returned {response.status_code}")
 
-            soup = BeautifulSoup(response.text, "html.parser")
+            # lxml's C parser is much faster than html.parser; feed it bytes
+            # so encoding detection also happens in C
+            if LET is not None:
+                soup = BeautifulSoup(response.content, "lxml")
+            else:
+                soup = BeautifulSoup(response.text, "html.parser")
             results = []
 
             # Check for CAPTCHA or rate limiting
@@ -422,6 +617,10 @@ class GoogleScholarClient:
                 if metadata:
                     results.append(metadata)
 
+            # Empty pages may be soft blocks, so only real hits are cached
+            if results:
+                self._cache_put(cache_key, results)
+
             return results
 
         except Exception as e:
@@ -511,17 +710,129 @@ class GoogleScholarClient:
             return None
 
 
+# =============================================================================
+# arXiv API Client (for ID lookup)
+# =============================================================================
+
+class ArxivClient:
+    """Async client for the arXiv Atom API (ID lookup)."""
+
+    BASE_URL = "https://export.arxiv.org/api/query"
+    NS = {
+        "atom": "http://www.w3.org/2005/Atom",
+        "arxiv": "http://arxiv.org/schemas/atom",
+    }
+
+    def __init__(self, http_client: httpx.AsyncClient):
+        self.http_client = http_client
+
+    async def lookup_id(self, arxiv_id: str) -> Optional[CitationMetadata]:
+        """
+        Look up metadata for an arXiv ID.
+
+        Args:
+            arxiv_id: arXiv identifier (e.g., "2301.07041")
+
+        Returns:
+            CitationMetadata or None
+        """
+        try:
+            response = await self.http_client.get(
+                self.BASE_URL,
+                params={"id_list": arxiv_id, "max_results": 1},
+                timeout=30.0,
+            )
+            response.raise_for_status()
+
+            root = ET.fromstring(response.content)
+            entry = root.find("atom:entry", self.NS)
+            # Malformed IDs come back as an entry pointing at /api/errors
+            if entry is None or "/api/errors" in entry.findtext("atom:id", "", self.NS):
+                return None
+
+            authors = [
+                name
+                for name in (a.findtext("atom:name", "", self.NS) for a in entry.findall("atom:author", self.NS))
+                if name
+            ]
+            published = entry.findtext("atom:published", "", self.NS)
+            abstract = entry.findtext("atom:summary", "", self.NS).strip().replace("\n", " ")
+
+            return CitationMetadata(
+                title=entry.findtext("atom:title", "Unknown", self.NS).strip().replace("\n", " "),
+                authors=authors,
+                year=int(published[:4]) if published[:4].isdigit() else None,
+                venue=entry.findtext("arxiv:journal_ref", None, self.NS),
+                doi=entry.findtext("arxiv:doi", None, self.NS),
+                arxiv_id=arxiv_id,
+                url=f"https://arxiv.org/abs/{arxiv_id}",
+                abstract=abstract or None,
+                source="arxiv",
+            )
+
+        except Exception as e:
+            raise RuntimeError(f"arXiv lookup failed for {arxiv_id}: {e}")
+
+
 # =============================================================================
 # Unified Metadata Extractor
 # =============================================================================
 
+def _doi_from_path(path: str) -> Optional[tuple[str, str]]:
+    """doi.org/<doi>"""
+    return ("doi", path.lstrip("/"))
+
+
+def _pmid_from_path(path: str) -> Optional[tuple[str, str]]:
+    """pubmed.ncbi.nlm.nih.gov/<pmid>/"""
+    pmid = _PUBMED_PATH_RE.search(path)
+    return ("pmid", pmid.group(1)) if pmid else None
+
+
+def _arxiv_from_path(path: str) -> Optional[tuple[str, str]]:
+    """arxiv.org/abs/<id>"""
+    arxiv_id = _ARXIV_PATH_RE.search(path)
+    return ("arxiv", arxiv_id.group(1)) if arxiv_id else None
+
+
+def _acl_from_path(path: str) -> Optional[tuple[str, str]]:
+    """ACL Anthology IDs map directly onto the ACL DOI prefix."""
+    anthology_id = path.strip("/").removesuffix(".pdf")
+    if anthology_id and "/" not in anthology_id:
+        return ("doi", f"10.18653/v1/{anthology_id}")
+    return None
+
+
+# URL host (or parent domain) -> path parser
+_URL_HOST_HANDLERS: dict[str, Callable[[str], Optional[tuple[str, str]]]] = {
+    "doi.org": _doi_from_path,
+    "pubmed.ncbi.nlm.nih.gov": _pmid_from_path,
+    "arxiv.org": _arxiv_from_path,
+    "aclanthology.org": _acl_from_path,
+}
+
+
 class MetadataExtractor:
     """Extract metadata from various identifier types."""
 
-    def __init__(self, http_client: httpx.AsyncClient):
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        arxiv_lookup: Optional[Callable[[str], Awaitable[Optional[CitationMetadata]]]] = None,
+    ):
         self.http_client = http_client
         self.crossref = CrossRefClient(http_client)
         self.pubmed = PubMedClient(http_client)
+        # Optional arXiv resolver (e.g. ArxivClient(...).lookup_id) so arXiv
+        # identifiers resolve here instead of needing a second search
+        self.arxiv_lookup = arxiv_lookup
+        # Cap in-flight requests per host when callers gather() many
+        # extract() calls, so bursts don't trip the APIs' rate limits
+        self._host_limits = {
+            "crossref": asyncio.Semaphore(20),
+            "pubmed": asyncio.Semaphore(8),
+            "arxiv": asyncio.Semaphore(4),
+        }
 
     def identify_type(self, identifier: str) -> tuple[str, str]:
         """
@@ -533,22 +844,25 @@ class MetadataExtractor:
         identifier = identifier.strip()
 
         # URL handling
-        if identifier.startswith("http://") or identifier.startswith("https://"):
+        if identifier.startswith(("http://", "https://")):
+            # Canonical DOI links need no URL parsing
+            if identifier.startswith("https://doi.org/") and "?" not in identifier and "#" not in identifier:
+                return ("doi", identifier[16:].lstrip("/"))
             return self._parse_url(identifier)
 
-        # DOI
-        if identifier.startswith("10."):
-            return ("doi", identifier)
+        # DOI / prefixed arXiv ID
+        head = identifier[:6].lower()
+        for prefix, (id_type, strip) in _ID_PREFIXES.items():
+            if head.startswith(prefix):
+                return (id_type, identifier[strip:])
+
+        # PMID (7+ digit number); all-digit strings can't be anything else
+        if identifier.isdigit():
+            return ("pmid", identifier) if len(identifier) >= 7 else ("unknown", identifier)
 
         # arXiv ID
-        if re.match(r"^\d{4}\.\d{4,5}(v\d+)?$", identifier):
+        if _ARXIV_ID_RE.match(identifier):
             return ("arxiv", identifier)
-        if identifier.lower().startswith("arxiv:"):
-            return ("arxiv", identifier[6:])
-
-        # PMID (8+ digit number)
-        if identifier.isdigit() and len(identifier) >= 7:
-            return ("pmid", identifier)
 
         # PMCID
         if identifier.upper().startswith("PMC") and identifier[3:].isdigit():
@@ -558,24 +872,23 @@ class MetadataExtractor:
 
     def _parse_url(self, url: str) -> tuple[str, str]:
         """Parse URL to extract identifier."""
-        parsed = urlparse(url)
-
-        # DOI URLs
-        if "doi.org" in parsed.netloc:
-            doi = parsed.path.lstrip("/")
-            return ("doi", doi)
-
-        # PubMed URLs
-        if "pubmed.ncbi.nlm.nih.gov" in parsed.netloc:
-            pmid = re.search(r"/(\d+)", parsed.path)
-            if pmid:
-                return ("pmid", pmid.group(1))
-
-        # arXiv URLs
-        if "arxiv.org" in parsed.netloc:
-            arxiv_id = re.search(r"/abs/(\d{4}\.\d{4,5})", parsed.path)
-            if arxiv_id:
-                return ("arxiv", arxiv_id.group(1))
+        match = _URL_HOST_RE.match(url)
+        if not match:
+            return ("url", url)
+        host, path = match.group(1).lower(), match.group(2)
+
+        # Known hosts (and their subdomains, e.g. dx.doi.org)
+        for suffix, handler in _URL_HOST_HANDLERS.items():
+            if host == suffix or host.endswith("." + suffix):
+                result = handler(path)
+                if result:
+                    return result
+                break
+
+        # Publisher landing pages (link.springer.com/article/10..., .../doi/10...)
+        doi_match = _DOI_IN_PATH_RE.search(path)
+        if doi_match:
+            return ("doi", doi_match.group(1))
 
         return ("url", url)
 
@@ -592,13 +905,15 @@ class MetadataExtractor:
         id_type, cleaned_id = self.identify_type(identifier)
 
         if id_type == "doi":
-            return await self.crossref.lookup_doi(cleaned_id)
+            async with self._host_limits["crossref"]:
+                return await self.crossref.lookup_doi(cleaned_id)
         elif id_type == "pmid":
-            results = await self.pubmed._fetch_metadata([cleaned_id])
+            async with self._host_limits["pubmed"]:
+                results = await self.pubmed._fetch_metadata([cleaned_id])
             return results[0] if results else None
-        elif id_type == "arxiv":
-            # Use arXiv API (already exists in research.py)
-            return None  # Let search_arxiv handle this
+        elif id_type == "arxiv" and self.arxiv_lookup is not None:
+            async with self._host_limits["arxiv"]:
+                return await self.arxiv_lookup(cleaned_id)
         else:
             return None
 
@@ -728,40 +1043,35 @@ def format_results(
     if not results:
         return f"No papers found on {source} for query: '{query}'"
 
-    lines = [f"Found {len(results)} papers on {source} for '{query}':\n"]
-
-    for i, paper in enumerate(results, 1):
-        # Authors
-        authors_str = ", ".join(paper.authors[:3])
-        if len(paper.authors) > 3:
-            authors_str += " et al."
-
-        # Title (plain text)
-        lines.append(f"{i}. **{paper.title}**")
-        lines.append(f"   Authors: {authors_str}")
-
-        if paper.year:
-            lines.append(f"   Year: {paper.year}")
+    header = f"Found {len(results)} papers on {source} for '{query}':\n"
+    blocks = [_format_paper(i, paper) for i, paper in enumerate(results, 1)]
 
-        if paper.venue:
-            lines.append(f"   Venue: {paper.venue}")
+    return "\n".join([header, *blocks])
 
-        if paper.citation_count > 0:
-            lines.append(f"   Citations: {paper.citation_count}")
 
-        # URL on separate line (clickable)
-        if paper.url:
-            lines.append(f"   Link: {paper.url}")
+def _format_paper(i: int, paper: CitationMetadata) -> str:
+    """Format one search result as a block of lines (trailing blank line included)."""
+    authors = paper.authors
 
-        if paper.doi:
-            lines.append(f"   DOI: https://doi.org/{paper.doi}")
+    # Authors
+    authors_str = ", ".join(authors[:3])
+    if len(authors) > 3:
+        authors_str += " et al."
 
-        if paper.abstract:
-            abstract = paper.abstract[:300]
-            if len(paper.abstract) > 300:
-                abstract += "..."
-            lines.append(f"   Abstract: {abstract}")
+    abstract = paper.abstract
+    if abstract and len(abstract) > 300:
+        abstract = abstract[:300] + "..."
 
-        lines.append("")
+    # Title (plain text); URL on separate line (clickable)
+    parts = (
+        f"{i}. **{paper.title}**",
+        f"   Authors: {authors_str}",
+        paper.year and f"   Year: {paper.year}",
+        paper.venue and f"   Venue: {paper.venue}",
+        paper.citation_count > 0 and f"   Citations: {paper.citation_count}",
+        paper.url and f"   Link: {paper.url}",
+        paper.doi and f"   DOI: https://doi.org/{paper.doi}",
+        abstract and f"   Abstract: {abstract}",
+    )
 
-    return "\n".join(lines)
+    return "\n".join(filter(None, parts)) + "\n"
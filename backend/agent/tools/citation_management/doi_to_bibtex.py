@@ -5,19 +5,150 @@ Quick utility to convert DOIs to BibTeX format using CrossRef API.
 """
 
 import argparse
+import hashlib
 import json
+import os
 import sys
-import time
-
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+
+try:
+    from ._bibtex import to_bibtex_value
+    from ._common import HTTP2_AVAILABLE, read_cache, send_with_retries, write_cache
+except ImportError:  # run as a script
+    from _bibtex import to_bibtex_value
+    from _common import HTTP2_AVAILABLE, read_cache, send_with_retries, write_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CROSSREF_WORKS_URL = "https://api.crossref.org/works"
+
+# DOIs CrossRef does not know (DataCite, Zenodo, arXiv...) are resolved
+# through doi.org content negotiation instead
+DOI_RESOLVER_URL = "https://doi.org"
+
+# Prefixes stripped from user-supplied DOIs
+DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "doi:")
+
+# CrossRef work types to BibTeX entry types
+CROSSREF_TYPE_MAP = {
+    "journal-article": "article",
+    "proceedings-article": "inproceedings",
+    "book-chapter": "incollection",
+    "book": "book",
+    "dissertation": "phdthesis",
+    "report": "techreport",
+    "posted-content": "misc",
+    "dataset": "misc",
+}
+
+# Date fields in order of preference for the publication year
+CROSSREF_DATE_FIELDS = ("published-print", "published-online", "published", "created")
+
+# Only the fields _work_to_bibtex reads; skips reference lists, licenses etc.
+CROSSREF_SELECT = ",".join(
+    ("DOI", "type", "title", "author", "container-title", "volume", "issue", "page", "publisher") + CROSSREF_DATE_FIELDS
+)
+
+# DOI metadata rarely changes, so converted entries are kept on disk
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "aura" / "doi_bibtex"
+CACHE_TTL = 30 * 24 * 3600  # seconds
+# Bump when the generated entries change, so older cached ones are ignored
+CACHE_VERSION = 2
 
 
 class DOIConverter:
     """Convert DOIs to BibTeX entries using CrossRef API."""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "DOIConverter/1.0 (Citation Management Tool; mailto:support@example.com)"})
+    # DOIs per CrossRef filter request (keeps the query string well under URL limits)
+    BATCH_SIZE = 20
+
+    USER_AGENT = "DOIConverter/1.0 (Citation Management Tool; mailto:support@example.com)"
+
+    def __init__(
+        self,
+        use_cache: bool = True,
+        http_client: httpx.Client | None = None,
+    ):
+        """
+        Initialize converter.
+
+        Args:
+            use_cache: Read and write the on-disk DOI -> BibTeX cache
+            http_client: Shared client for CrossRef lookups (not closed by close())
+        """
+        # One pooled (HTTP/2 when available) client so repeated lookups reuse
+        # the same TLS connection to api.crossref.org
+        self._owns_session = http_client is None
+        self.session = http_client or httpx.Client(
+            headers={"User-Agent": self.USER_AGENT},
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=30),
+            timeout=15,
+            follow_redirects=True,
+        )
+        self.use_cache = use_cache
+        self._memory_cache: dict[str, str] = {}
+
+    def close(self) -> None:
+        """Close the pooled HTTP client if this converter created it."""
+        if self._owns_session:
+            self.session.close()
+
+    def _get(self, url: str, params: dict | None = None, headers: dict | None = None) -> httpx.Response:
+        """GET with retries on transient errors and retryable statuses."""
+        return send_with_retries(self.session, self.session.build_request("GET", url, params=params, headers=headers))
+
+    @staticmethod
+    def _json(response: httpx.Response) -> dict:
+        """Decode a CrossRef response, with orjson when it is installed."""
+        return orjson.loads(response.content) if orjson is not None else response.json()
+
+    def _cache_path(self, doi: str) -> Path:
+        """Cache file for a DOI (DOIs are case-insensitive)."""
+        return CACHE_DIR / f"v{CACHE_VERSION}" / f"{hashlib.sha1(doi.lower().encode()).hexdigest()}.bib"
+
+    def _cache_get(self, doi: str) -> str | None:
+        """Return a cached BibTeX entry, or None if missing or expired."""
+        if not self.use_cache:
+            return None
+
+        bibtex = self._memory_cache.get(doi.lower())
+        if bibtex is not None:
+            return bibtex
+
+        raw = read_cache(self._cache_path(doi), CACHE_TTL)
+        if raw is None:
+            return None
+        bibtex = raw.decode("utf-8")
+
+        self._memory_cache[doi.lower()] = bibtex
+        return bibtex
+
+    def _cache_put(self, doi: str, bibtex: str) -> None:
+        """Store a BibTeX entry in memory and on disk (best effort, atomic)."""
+        if not self.use_cache:
+            return
+
+        self._memory_cache[doi.lower()] = bibtex
+
+        try:
+            write_cache(self._cache_path(doi), bibtex.encode("utf-8"))
+        except OSError as e:
+            print(f"Warning: Could not write cache for {doi}: {e}", file=sys.stderr)
+
+    def _clean_doi(self, doi: str) -> str:
+        """Remove URL or doi: prefix from a DOI."""
+        doi = doi.strip()
+        for prefix in DOI_PREFIXES:
+            doi = doi.removeprefix(prefix)
+        return doi
 
     def doi_to_bibtex(self, doi: str) -> str | None:
         """
@@ -30,66 +161,224 @@ class DOIConverter:
             BibTeX string or None if conversion fails
         """
         # Clean DOI (remove URL prefix if present)
-        doi = doi.strip()
-        if doi.startswith("https://doi.org/"):
-            doi = doi.replace("https://doi.org/", "")
-        elif doi.startswith("http://doi.org/"):
-            doi = doi.replace("http://doi.org/", "")
-        elif doi.startswith("doi:"):
-            doi = doi.replace("doi:", "")
+        doi = self._clean_doi(doi)
+
+        cached = self._cache_get(doi)
+        if cached:
+            return cached
 
-        # Request BibTeX from CrossRef content negotiation
-        url = f"https://doi.org/{doi}"
-        headers = {"Accept": "application/x-bibtex", "User-Agent": "DOIConverter/1.0 (Citation Management Tool)"}
+        # Fetch the work record straight from the CrossRef API (no doi.org
+        # redirect chain) and format the BibTeX locally
+        url = f"{CROSSREF_WORKS_URL}/{doi}"
 
         try:
-            response = self.session.get(url, headers=headers, timeout=15)
+            response = self._get(url)
 
             if response.status_code == 200:
-                bibtex = response.text.strip()
-                # CrossRef sometimes returns entries with @data type, convert to @misc
-                if bibtex.startswith("@data{"):
-                    bibtex = bibtex.replace("@data{", "@misc{", 1)
+                bibtex = self._work_to_bibtex(self._json(response).get("message", {}))
+                self._cache_put(doi, bibtex)
                 return bibtex
             elif response.status_code == 404:
-                print(f"Error: DOI not found: {doi}", file=sys.stderr)
-                return None
+                return self._resolve_bibtex(doi)
             else:
                 print(f"Error: Failed to retrieve BibTeX for {doi} (status {response.status_code})", file=sys.stderr)
                 return None
 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             print(f"Error: Request timeout for DOI: {doi}", file=sys.stderr)
             return None
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error: Request failed for {doi}: {e}", file=sys.stderr)
             return None
 
-    def convert_multiple(self, dois: list[str], delay: float = 0.5) -> list[str]:
+    def _resolve_bibtex(self, doi: str) -> str | None:
         """
-        Convert multiple DOIs to BibTeX.
+        Fetch BibTeX for a DOI through doi.org content negotiation.
+
+        Used for DOIs CrossRef does not register, such as DataCite DOIs.
 
         Args:
-            dois: List of DOIs
-            delay: Delay between requests (seconds) for rate limiting
+            doi: Cleaned DOI
 
         Returns:
-            List of BibTeX entries (excludes failed conversions)
+            BibTeX string or None if conversion fails
         """
-        bibtex_entries = []
+        try:
+            response = self._get(f"{DOI_RESOLVER_URL}/{doi}", headers={"Accept": "application/x-bibtex"})
+        except httpx.TimeoutException:
+            print(f"Error: Request timeout for DOI: {doi}", file=sys.stderr)
+            return None
+        except httpx.HTTPError as e:
+            print(f"Error: Request failed for {doi}: {e}", file=sys.stderr)
+            return None
 
-        for i, doi in enumerate(dois):
-            print(f"Converting DOI {i+1}/{len(dois)}: {doi}", file=sys.stderr)
-            bibtex = self.doi_to_bibtex(doi)
+        if response.status_code == 404:
+            print(f"Error: DOI not found: {doi}", file=sys.stderr)
+            return None
+        if response.status_code != 200:
+            print(f"Error: Failed to retrieve BibTeX for {doi} (status {response.status_code})", file=sys.stderr)
+            return None
 
-            if bibtex:
-                bibtex_entries.append(bibtex)
+        bibtex = response.text.strip()
+        # DataCite returns datasets as @data, which BibTeX styles do not know
+        if bibtex.startswith("@data{"):
+            bibtex = bibtex.replace("@data{", "@misc{", 1)
+        self._cache_put(doi, bibtex)
+        return bibtex
 
-            # Rate limiting
-            if i < len(dois) - 1:  # Don't delay after last request
-                time.sleep(delay)
+    def _fetch_batches(self, dois: list[str], max_concurrency: int = 8) -> dict[str, str]:
+        """
+        Convert many DOIs with CrossRef's filter API, BATCH_SIZE per request.
 
-        return bibtex_entries
+        Batches run concurrently on worker threads over the pooled session.
+
+        Args:
+            dois: Cleaned DOIs (must not contain commas)
+            max_concurrency: Maximum number of batch requests in flight
+
+        Returns:
+            Mapping of lower-cased DOI to BibTeX entry (DOIs not found are omitted)
+        """
+        batches = [dois[i : i + self.BATCH_SIZE] for i in range(0, len(dois), self.BATCH_SIZE)]
+        found = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(batches)))) as executor:
+            for works in executor.map(self._fetch_batch, batches):
+                for work in works:
+                    if work.get("DOI"):
+                        found[work["DOI"].lower()] = self._work_to_bibtex(work)
+        return found
+
+    def _fetch_batch(self, batch: list[str]) -> list[dict]:
+        """Fetch CrossRef work records for one batch of DOIs."""
+        params = {"filter": ",".join(f"doi:{doi}" for doi in batch), "rows": len(batch), "select": CROSSREF_SELECT}
+        try:
+            response = self._get(CROSSREF_WORKS_URL, params)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            print(f"Error: Batch request failed for {len(batch)} DOIs: {e}", file=sys.stderr)
+            return []
+
+        return self._json(response).get("message", {}).get("items", [])
+
+    def _work_to_bibtex(self, work: dict) -> str:
+        """Format a CrossRef work record as a BibTeX entry."""
+        doi = work.get("DOI", "")
+        entry_type = CROSSREF_TYPE_MAP.get(work.get("type"), "misc")
+
+        authors = []
+        for author in work.get("author", []):
+            family = author.get("family")
+            if family:
+                given = author.get("given")
+                authors.append(f"{family}, {given}" if given else family)
+
+        year = ""
+        for date_field in CROSSREF_DATE_FIELDS:
+            parts = work.get(date_field, {}).get("date-parts")
+            if parts and parts[0] and parts[0][0]:
+                year = str(parts[0][0])
+                break
+
+        title = (work.get("title") or [""])[0]
+        container = (work.get("container-title") or [""])[0]
+
+        # Citation key: first author's family name + year
+        key_name = "".join(ch for ch in (authors[0].split(",")[0] if authors else "") if ch.isalnum())
+        citation_key = f"{key_name}{year}" if key_name else doi.replace("/", "_")
+
+        fields = [("author", " and ".join(authors)), ("title", title)]
+        if entry_type == "article":
+            fields.append(("journal", container))
+        elif entry_type in ("inproceedings", "incollection"):
+            fields.append(("booktitle", container))
+        fields += [
+            ("year", year),
+            ("volume", work.get("volume", "")),
+            ("number", work.get("issue", "")),
+            ("pages", work.get("page", "").replace("-", "--")),
+            ("publisher", work.get("publisher", "")),
+        ]
+        # CrossRef text may carry JATS/HTML markup and LaTeX specials; the
+        # DOI is left as is, since styles typeset it verbatim
+        fields = [(name, to_bibtex_value(value)) for name, value in fields if value]
+        if doi:
+            fields.append(("doi", doi))
+
+        lines = [f"@{entry_type}{{{citation_key},"]
+        lines.extend(f"  {name:<9} = {{{value}}}," for name, value in fields if value)
+        lines[-1] = lines[-1].rstrip(",")
+        lines.append("}")
+        return "\n".join(lines)
+
+    def iter_bibtex(self, dois: list[str], max_concurrency: int = 8) -> Iterator[str]:
+        """
+        Convert multiple DOIs to BibTeX, yielding entries as they are ready.
+
+        DOIs are looked up in batches through CrossRef's filter API rather
+        than one request per DOI, the batches running concurrently on worker
+        threads over the pooled session. Input is processed in windows
+        of BATCH_SIZE * max_concurrency DOIs, so the first entries are
+        available after one round of requests and memory stays bounded.
+
+        Args:
+            dois: List of DOIs
+            max_concurrency: Maximum number of CrossRef requests in flight
+
+        Yields:
+            BibTeX entries in input order (failed conversions are skipped)
+        """
+        cleaned = [self._clean_doi(doi) for doi in dois]
+        window = self.BATCH_SIZE * max(max_concurrency, 1)
+
+        for start in range(0, len(cleaned), window):
+            yield from self._convert_window(cleaned[start : start + window], max_concurrency)
+
+    def _convert_window(self, cleaned: list[str], max_concurrency: int) -> list[str]:
+        """Convert one window of cleaned DOIs (cache first, then batched lookups)."""
+        found = {}
+        for doi in cleaned:
+            cached = self._cache_get(doi)
+            if cached:
+                found[doi.lower()] = cached
+
+        # Commas separate filter values, so those DOIs go through the single-DOI path
+        batchable = [doi for doi in cleaned if "," not in doi and doi.lower() not in found]
+        if batchable:
+            print(f"Converting {len(batchable)} DOIs in batches of {self.BATCH_SIZE}...", file=sys.stderr)
+            fetched = self._fetch_batches(batchable, max_concurrency=max_concurrency)
+            for doi, bibtex in fetched.items():
+                self._cache_put(doi, bibtex)
+            found.update(fetched)
+
+        # DOIs the batches did not return are not registered with CrossRef
+        # (or contain commas); resolve those one by one, concurrently
+        missing = list(dict.fromkeys(doi for doi in cleaned if doi.lower() not in found))
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(missing)))) as executor:
+                for doi, bibtex in zip(missing, executor.map(self._convert_missing, missing)):
+                    if bibtex:
+                        found[doi.lower()] = bibtex
+
+        return [found[doi.lower()] for doi in cleaned if doi.lower() in found]
+
+    def _convert_missing(self, doi: str) -> str | None:
+        """Convert a DOI the batched lookup did not return."""
+        return self.doi_to_bibtex(doi) if "," in doi else self._resolve_bibtex(doi)
+
+    def convert_multiple(self, dois: list[str], delay: float | None = None, max_concurrency: int = 8) -> list[str]:
+        """
+        Convert multiple DOIs to BibTeX.
+
+        Args:
+            dois: List of DOIs
+            delay: Deprecated and ignored (requests are batched and retried
+                with backoff instead of spaced by a fixed delay)
+            max_concurrency: Maximum number of CrossRef requests in flight
+
+        Returns:
+            List of BibTeX entries (excludes failed conversions)
+        """
+        return list(self.iter_bibtex(dois, max_concurrency=max_concurrency))
 
 
 def main():
@@ -104,10 +393,14 @@ def main():
 
     parser.add_argument("-o", "--output", help="Output file for BibTeX (default: stdout)")
 
-    parser.add_argument("--delay", type=float, default=0.5, help="Delay between requests in seconds (default: 0.5)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent CrossRef requests (default: 8)")
+
+    parser.add_argument("--delay", type=float, help="Deprecated and ignored; use --concurrency")
 
     parser.add_argument("--format", choices=["bibtex", "json"], default="bibtex", help="Output format (default: bibtex)")
 
+    parser.add_argument("--no-cache", action="store_true", help=f"Do not read or write the DOI cache ({CACHE_DIR})")
+
     args = parser.parse_args()
 
     # Collect DOIs from command line and/or file
@@ -132,44 +425,54 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    # Convert DOIs
-    converter = DOIConverter()
+    # Convert DOIs, writing each entry as soon as it is ready
+    converter = DOIConverter(use_cache=not args.no_cache)
 
     if len(dois) == 1:
         bibtex = converter.doi_to_bibtex(dois[0])
-        if bibtex:
-            bibtex_entries = [bibtex]
-        else:
-            sys.exit(1)
+        entries = iter([bibtex] if bibtex else [])
     else:
-        bibtex_entries = converter.convert_multiple(dois, delay=args.delay)
+        entries = converter.iter_bibtex(dois, max_concurrency=args.concurrency)
 
-    if not bibtex_entries:
-        print("Error: No successful conversions", file=sys.stderr)
+    try:
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    except OSError as e:
+        print(f"Error writing output file: {e}", file=sys.stderr)
         sys.exit(1)
 
-    # Format output
-    if args.format == "bibtex":
-        output = "\n\n".join(bibtex_entries) + "\n"
-    else:  # json
-        output = json.dumps({"count": len(bibtex_entries), "entries": bibtex_entries}, indent=2)
+    count = 0
+    try:
+        if args.format == "json":
+            out.write('{\n  "entries": [')
+        for bibtex in entries:
+            if args.format == "bibtex":
+                out.write(f"\n\n{bibtex}" if count else bibtex)
+            else:
+                out.write(f"{',' if count else ''}\n    {json.dumps(bibtex)}")
+            out.flush()
+            count += 1
+        if args.format == "json":
+            out.write(f'\n  ],\n  "count": {count}\n}}')
+        out.write("\n")
+    except OSError as e:
+        print(f"Error writing output file: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        converter.close()
+        if out is not sys.stdout:
+            out.close()
+
+    if not count:
+        print("Error: No successful conversions", file=sys.stderr)
+        sys.exit(1)
 
-    # Write output
     if args.output:
-        try:
-            with open(args.output, "w", encoding="utf-8") as f:
-                f.write(output)
-            print(f"Successfully wrote {len(bibtex_entries)} entries to {args.output}", file=sys.stderr)
-        except Exception as e:
-            print(f"Error writing output file: {e}", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print(output)
+        print(f"Successfully wrote {count} entries to {args.output}", file=sys.stderr)
 
     # Summary
     if len(dois) > 1:
-        success_rate = len(bibtex_entries) / len(dois) * 100
-        print(f"\nConverted {len(bibtex_entries)}/{len(dois)} DOIs ({success_rate:.1f}%)", file=sys.stderr)
+        success_rate = count / len(dois) * 100
+        print(f"\nConverted {count}/{len(dois)} DOIs ({success_rate:.1f}%)", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -5,30 +5,206 @@ Extract citation metadata from DOI, PMID, arXiv ID, or URL using various APIs.
 """
 
 import argparse
+import hashlib
 import json
 import os
 import re
 import sys
-import time
+import threading
 import xml.etree.ElementTree as ET
+from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterable
 from urllib.parse import urlparse
 
-import requests
+import httpx
+
+try:
+    from ._common import HTTP2_AVAILABLE, ChunkReader, RequestPacer, read_cache, send_with_retries, write_cache
+except ImportError:  # run as a script
+    from _common import HTTP2_AVAILABLE, ChunkReader, RequestPacer, read_cache, send_with_retries, write_cache
+
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
+
+# Remote XML is untrusted: without lxml, parse through defusedxml when it is
+# installed (DTDs stay allowed since PubMed responses declare a DOCTYPE)
+try:
+    from defusedxml import ElementTree as SafeET
+except ImportError:
+    SafeET = ET
+
+# Never expand entities or fetch external resources while parsing API responses
+_LXML_PARSER_OPTIONS = {"resolve_entities": False, "no_network": True, "huge_tree": False}
+
+# CrossRef JSON is decoded (and cached) with orjson when it is installed
+try:
+    import orjson
+
+    _loads, _dumps = orjson.loads, orjson.dumps
+
+    def _dumps_indented(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    def _dumps_indented(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+
+# Raw API records (CrossRef JSON, PubMed/arXiv XML) are cached on disk so
+# re-running over a bibliography skips the network; parsing happens on read
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "aura" / "metadata"
+CACHE_TTL = 90 * 24 * 3600  # seconds
+
+# Minimum seconds between requests to each API host, used until the server
+# advertises its own limit (CrossRef sends X-Rate-Limit-Limit/-Interval)
+RATE_INTERVALS = {
+    "api.crossref.org": 1 / 50,
+    "eutils.ncbi.nlm.nih.gov": 1 / 3,
+    "export.arxiv.org": 3.0,
+}
+
+# Bare identifier prefixes -> type ("arXiv:" is stripped, DOIs kept whole)
+_ID_PREFIXES = {"10.": "doi", "arXiv:": "arxiv"}
+
+_ARXIV_ID_RE = re.compile(r"^\d{4}\.\d{4,5}(v\d+)?$")
+_DOI_IN_URL_RE = re.compile(r"10\.\d{4,}/[^\s/]+")
+_PUBMED_PATH_RE = re.compile(r"/(\d+)")
+_ARXIV_PATH_RE = re.compile(r"/abs/(\d{4}\.\d{4,5})")
+_YEAR_RE = re.compile(r"\d{4}")
+_TITLE_WORD_RE = re.compile(r"\b[a-zA-Z]{4,}\b")
+_NONALPHA_RE = re.compile(r"[^a-zA-Z]")
+
+# CrossRef fields _crossref_metadata reads (DOI is needed to match batch items)
+CROSSREF_SELECT = "DOI,type,title,author,published-print,published-online,container-title,volume,issue,page,publisher"
+
+# CrossRef work types to BibTeX entry types (anything else is misc)
+CROSSREF_TYPE_MAP = {
+    "journal-article": "article",
+    "book": "book",
+    "book-chapter": "incollection",
+    "proceedings-article": "inproceedings",
+    "posted-content": "misc",
+    "dataset": "misc",
+    "report": "techreport",
+}
+
+# Acronyms and proper nouns whose capitalization BibTeX styles must keep
+PROTECTED_WORDS = ("DNA", "RNA", "CRISPR", "COVID", "HIV", "AIDS", "AlphaFold", "Python", "AI", "ML", "GPU", "CPU", "USA", "UK", "EU")
+_PROTECTED_CANONICAL = {word.lower(): word for word in PROTECTED_WORDS}
+_PROTECT_RE = re.compile(r"\b(" + "|".join(map(re.escape, PROTECTED_WORDS)) + r")\b", re.IGNORECASE)
+
+ARXIV_NS = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
+ARXIV_ENTRY_TAG = "{http://www.w3.org/2005/Atom}entry"
+_ARXIV_VERSION_RE = re.compile(r"v\d+$")
 
 
 class MetadataExtractor:
     """Extract metadata from various sources and generate BibTeX."""
 
-    def __init__(self, email: str | None = None):
+    # DOIs per CrossRef filter request (keeps the query string under URL limits)
+    DOI_BATCH_SIZE = 40
+    # PMIDs per EFetch request (NCBI's recommended maximum)
+    PMID_BATCH_SIZE = 200
+    # arXiv IDs per id_list query
+    ARXIV_BATCH_SIZE = 100
+
+    def __init__(self, email: str | None = None, use_cache: bool = True):
         """
         Initialize extractor.
 
         Args:
-            email: Email for Entrez API (recommended for PubMed)
+            email: Email for Entrez and the CrossRef polite pool (recommended)
+            use_cache: Read and write the on-disk API response cache
         """
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "MetadataExtractor/1.0 (Citation Management Tool)"})
+        # One pooled client shared by the worker threads; over HTTP/2 the
+        # concurrent requests to a host are multiplexed on a single connection
+        self.client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=15.0,
+            headers={"User-Agent": "MetadataExtractor/1.0 (Citation Management Tool)"},
+            follow_redirects=True,
+        )
         self.email = email or os.getenv("NCBI_EMAIL", "")
+        self.api_key = os.getenv("NCBI_API_KEY")
+        self.use_cache = use_cache
+        # Cap concurrent requests per API host when extracting in parallel
+        # (NCBI allows 3 req/s without a key, 10 with one; CrossRef's polite pool ~50)
+        ncbi_rate = 10 if self.api_key else 3
+        self._host_limits = {
+            "api.crossref.org": threading.Semaphore(50),
+            "eutils.ncbi.nlm.nih.gov": threading.Semaphore(ncbi_rate),
+            "export.arxiv.org": threading.Semaphore(1),
+        }
+        # Per-host request pacing, shared by the worker threads
+        self._pacer = RequestPacer({**RATE_INTERVALS, "eutils.ncbi.nlm.nih.gov": 1 / ncbi_rate})
+
+    def _cache_path(self, id_type: str, clean_id: str) -> Path:
+        """Cache file for an identifier."""
+        return CACHE_DIR / id_type / hashlib.sha1(clean_id.lower().encode()).hexdigest()
+
+    def _cache_get(self, id_type: str, clean_id: str) -> bytes | None:
+        """Return the cached raw API record, or None if missing or expired."""
+        if not self.use_cache:
+            return None
+
+        return read_cache(self._cache_path(id_type, clean_id), CACHE_TTL)
+
+    def _cache_put(self, id_type: str, clean_id: str, raw: bytes) -> None:
+        """Store a raw API record (best effort, atomic)."""
+        if not self.use_cache:
+            return
+
+        try:
+            write_cache(self._cache_path(id_type, clean_id), raw)
+        except OSError as e:
+            print(f"Warning: Could not write cache for {clean_id}: {e}", file=sys.stderr)
+
+    def close(self) -> None:
+        """Close the pooled HTTP client."""
+        self.client.close()
+
+    def _host_slot(self, url: str):
+        """Concurrency slot for the URL's host (a no-op for unlimited hosts)."""
+        limit = self._host_limits.get(urlparse(url).netloc)
+        return limit if limit is not None else nullcontext()
+
+    def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request while holding a concurrency slot for its host."""
+        with self._host_slot(url):
+            return self._send(method, url, False, **kwargs)
+
+    @contextmanager
+    def _stream(self, method: str, url: str, **kwargs) -> Iterator[httpx.Response]:
+        """
+        Send a request and yield the response with its body unread.
+
+        The host's concurrency slot is held until the body has been read
+        and the response closed, not just until the headers arrive.
+        """
+        with self._host_slot(url):
+            response = self._send(method, url, True, **kwargs)
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def _send(self, method: str, url: str, stream: bool, **kwargs) -> httpx.Response:
+        """Send with retries, pacing each attempt to the host's rate limit."""
+        request = self.client.build_request(method, url, **kwargs)
+        # The last response is left to the status checks
+        return send_with_retries(self.client, request, self._pacer, stream=stream)
 
     def identify_type(self, identifier: str) -> tuple[str, str]:
         """
@@ -43,22 +219,22 @@ class MetadataExtractor:
         identifier = identifier.strip()
 
         # Check if URL
-        if identifier.startswith("http://") or identifier.startswith("https://"):
+        if identifier.startswith(("http://", "https://")):
             return self._parse_url(identifier)
 
-        # Check for DOI
-        if identifier.startswith("10."):
-            return ("doi", identifier)
+        # Check for DOI / prefixed arXiv ID
+        for prefix, id_type in _ID_PREFIXES.items():
+            if identifier.startswith(prefix):
+                return (id_type, identifier[len(prefix) :] if id_type == "arxiv" else identifier)
+
+        # Check for PMID (8-digit number typically); other digit-only
+        # strings cannot match any later pattern
+        if identifier.isdigit():
+            return ("pmid", identifier) if len(identifier) >= 7 else ("unknown", identifier)
 
         # Check for arXiv ID
-        if re.match(r"^\d{4}\.\d{4,5}(v\d+)?$", identifier):
+        if _ARXIV_ID_RE.match(identifier):
             return ("arxiv", identifier)
-        if identifier.startswith("arXiv:"):
-            return ("arxiv", identifier.replace("arXiv:", ""))
-
-        # Check for PMID (8-digit number typically)
-        if identifier.isdigit() and len(identifier) >= 7:
-            return ("pmid", identifier)
 
         # Check for PMCID
         if identifier.upper().startswith("PMC") and identifier[3:].isdigit():
@@ -77,18 +253,18 @@ class MetadataExtractor:
 
         # PubMed URLs
         if "pubmed.ncbi.nlm.nih.gov" in parsed.netloc or "ncbi.nlm.nih.gov/pubmed" in url:
-            pmid = re.search(r"/(\d+)", parsed.path)
+            pmid = _PUBMED_PATH_RE.search(parsed.path)
             if pmid:
                 return ("pmid", pmid.group(1))
 
         # arXiv URLs
         if "arxiv.org" in parsed.netloc:
-            arxiv_id = re.search(r"/abs/(\d{4}\.\d{4,5})", parsed.path)
+            arxiv_id = _ARXIV_PATH_RE.search(parsed.path)
             if arxiv_id:
                 return ("arxiv", arxiv_id.group(1))
 
         # Nature, Science, Cell, etc. - try to extract DOI from URL
-        doi_match = re.search(r"10\.\d{4,}/[^\s/]+", url)
+        doi_match = _DOI_IN_URL_RE.search(url)
         if doi_match:
             return ("doi", doi_match.group())
 
@@ -104,31 +280,29 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
+        # The filtered list route honours `select`, so it returns only the
+        # fields we read; DOIs with commas need the singleton route
+        if "," not in doi:
+            metadata = self.extract_from_dois([doi]).get(doi.lower())
+            if metadata is None:
+                print(f"Error: DOI not found: {doi}", file=sys.stderr)
+            return metadata
+
+        cached = self._cache_get("doi", doi)
+        if cached is not None:
+            return self._crossref_metadata(_loads(cached), doi)
+
         url = f"https://api.crossref.org/works/{doi}"
+        # Identify ourselves to qualify for CrossRef's polite pool
+        params = {"mailto": self.email} if self.email else None
 
         try:
-            response = self.session.get(url, timeout=15)
+            response = self._request("GET", url, params=params, timeout=15)
 
             if response.status_code == 200:
-                data = response.json()
-                message = data.get("message", {})
-
-                metadata = {
-                    "type": "doi",
-                    "entry_type": self._crossref_type_to_bibtex(message.get("type")),
-                    "doi": doi,
-                    "title": message.get("title", [""])[0],
-                    "authors": self._format_authors_crossref(message.get("author", [])),
-                    "year": self._extract_year_crossref(message),
-                    "journal": message.get("container-title", [""])[0] if message.get("container-title") else "",
-                    "volume": str(message.get("volume", "")) if message.get("volume") else "",
-                    "issue": str(message.get("issue", "")) if message.get("issue") else "",
-                    "pages": message.get("page", ""),
-                    "publisher": message.get("publisher", ""),
-                    "url": f"https://doi.org/{doi}",
-                }
-
-                return metadata
+                message = _loads(response.content).get("message", {})
+                self._cache_put("doi", doi, _dumps(message))
+                return self._crossref_metadata(message, doi)
             else:
                 print(f"Error: CrossRef API returned status {response.status_code} for DOI: {doi}", file=sys.stderr)
                 return None
@@ -137,6 +311,75 @@ class MetadataExtractor:
             print(f"Error extracting metadata from DOI {doi}: {e}", file=sys.stderr)
             return None
 
+    def extract_from_dois(self, dois: list[str]) -> dict[str, dict]:
+        """
+        Extract metadata for many DOIs using CrossRef's filter API.
+
+        One request covers DOI_BATCH_SIZE DOIs instead of one request each.
+        DOIs containing commas cannot be expressed in a filter and should go
+        through extract_from_doi.
+
+        Args:
+            dois: Digital Object Identifiers
+
+        Returns:
+            Dictionary mapping lowercased DOI to metadata (misses omitted)
+        """
+        url = "https://api.crossref.org/works"
+        results = {}
+
+        misses = []
+        for doi in dois:
+            cached = self._cache_get("doi", doi)
+            if cached is not None:
+                results[doi.lower()] = self._crossref_metadata(_loads(cached), doi)
+            else:
+                misses.append(doi)
+        dois = misses
+
+        for start in range(0, len(dois), self.DOI_BATCH_SIZE):
+            batch = dois[start : start + self.DOI_BATCH_SIZE]
+            params = {"filter": ",".join(f"doi:{doi}" for doi in batch), "rows": len(batch), "select": CROSSREF_SELECT}
+            if self.email:
+                params["mailto"] = self.email
+            # Report each hit under the caller's spelling of the DOI
+            requested = {doi.lower(): doi for doi in batch}
+
+            try:
+                response = self._request("GET", url, params=params, timeout=30)
+
+                if response.status_code != 200:
+                    print(f"Error: CrossRef API returned status {response.status_code} for {len(batch)} DOIs", file=sys.stderr)
+                    continue
+
+                for message in _loads(response.content).get("message", {}).get("items", []):
+                    key = message.get("DOI", "").lower()
+                    if key in requested:
+                        self._cache_put("doi", requested[key], _dumps(message))
+                        results[key] = self._crossref_metadata(message, requested[key])
+
+            except Exception as e:
+                print(f"Error extracting metadata for {len(batch)} DOIs: {e}", file=sys.stderr)
+
+        return results
+
+    def _crossref_metadata(self, message: dict, doi: str) -> dict:
+        """Build a metadata dictionary from a CrossRef work record."""
+        return {
+            "type": "doi",
+            "entry_type": CROSSREF_TYPE_MAP.get(message.get("type"), "misc"),
+            "doi": doi,
+            "title": message.get("title", [""])[0],
+            "authors": self._format_authors_crossref(message.get("author", [])),
+            "year": self._extract_year_crossref(message),
+            "journal": message.get("container-title", [""])[0] if message.get("container-title") else "",
+            "volume": str(message.get("volume", "")) if message.get("volume") else "",
+            "issue": str(message.get("issue", "")) if message.get("issue") else "",
+            "pages": message.get("page", ""),
+            "publisher": message.get("publisher", ""),
+            "url": f"https://doi.org/{doi}",
+        }
+
     def extract_from_pmid(self, pmid: str) -> dict | None:
         """
         Extract metadata from PMID using PubMed E-utilities.
@@ -147,63 +390,138 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-        params = {"db": "pubmed", "id": pmid, "retmode": "xml", "rettype": "abstract"}
+        try:
+            results = self._fetch_pubmed([pmid])
+        except Exception as e:
+            print(f"Error extracting metadata from PMID {pmid}: {e}", file=sys.stderr)
+            return None
 
-        if self.email:
-            params["email"] = self.email
+        metadata = results.get(pmid)
+        if metadata is None:
+            print(f"Error: No article found for PMID: {pmid}", file=sys.stderr)
+        return metadata
 
-        api_key = os.getenv("NCBI_API_KEY")
-        if api_key:
-            params["api_key"] = api_key
+    def extract_from_pmids(self, pmids: list[str]) -> dict[str, dict]:
+        """
+        Extract metadata for many PMIDs, PMID_BATCH_SIZE per EFetch request.
 
-        try:
-            response = self.session.get(url, params=params, timeout=15)
+        Args:
+            pmids: PubMed IDs
 
-            if response.status_code == 200:
-                root = ET.fromstring(response.content)
-                article = root.find(".//PubmedArticle")
-
-                if article is None:
-                    print(f"Error: No article found for PMID: {pmid}", file=sys.stderr)
-                    return None
-
-                # Extract metadata from XML
-                medline_citation = article.find(".//MedlineCitation")
-                article_elem = medline_citation.find(".//Article")
-                journal = article_elem.find(".//Journal")
-
-                # Get DOI if available
-                doi = None
-                article_ids = article.findall(".//ArticleId")
-                for article_id in article_ids:
-                    if article_id.get("IdType") == "doi":
-                        doi = article_id.text
-                        break
-
-                metadata = {
-                    "type": "pmid",
-                    "entry_type": "article",
-                    "pmid": pmid,
-                    "title": article_elem.findtext(".//ArticleTitle", ""),
-                    "authors": self._format_authors_pubmed(article_elem.findall(".//Author")),
-                    "year": self._extract_year_pubmed(article_elem),
-                    "journal": journal.findtext(".//Title", ""),
-                    "volume": journal.findtext(".//JournalIssue/Volume", ""),
-                    "issue": journal.findtext(".//JournalIssue/Issue", ""),
-                    "pages": article_elem.findtext(".//Pagination/MedlinePgn", ""),
-                    "doi": doi,
-                }
-
-                return metadata
+        Returns:
+            Dictionary mapping PMID to metadata (misses omitted)
+        """
+        results = {}
+
+        for start in range(0, len(pmids), self.PMID_BATCH_SIZE):
+            batch = pmids[start : start + self.PMID_BATCH_SIZE]
+            try:
+                results.update(self._fetch_pubmed(batch))
+            except Exception as e:
+                print(f"Error extracting metadata for {len(batch)} PMIDs: {e}", file=sys.stderr)
+
+        return results
+
+    def _fetch_pubmed(self, pmids: list[str]) -> dict[str, dict]:
+        """Fetch and parse one EFetch request for a list of PMIDs (cache first)."""
+        results = {}
+        misses = []
+        for pmid in pmids:
+            cached = self._cache_get("pmid", pmid)
+            metadata = self._parse_pubmed_article(self._xml_fromstring(cached)) if cached is not None else None
+            if metadata is not None:
+                results[pmid] = metadata
             else:
-                print(f"Error: PubMed API returned status {response.status_code} for PMID: {pmid}", file=sys.stderr)
-                return None
+                misses.append(pmid)
+        if not misses:
+            return results
+        pmids = misses
 
-        except Exception as e:
-            print(f"Error extracting metadata from PMID {pmid}: {e}", file=sys.stderr)
+        url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+        params = {"db": "pubmed", "id": ",".join(pmids), "retmode": "xml", "rettype": "abstract"}
+
+        if self.email:
+            params["email"] = self.email
+
+        if self.api_key:
+            params["api_key"] = self.api_key
+
+        # Long ID lists go in a POST body to stay clear of URL length limits.
+        # The response is streamed into the XML parser rather than buffered.
+        if len(pmids) > 20:
+            stream = self._stream("POST", url, data=params, timeout=30)
+        else:
+            stream = self._stream("GET", url, params=params, timeout=15)
+
+        with stream as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"PubMed API returned status {response.status_code}")
+
+            for article in self._iter_xml(ChunkReader(response.iter_bytes()), "PubmedArticle"):
+                metadata = self._parse_pubmed_article(article)
+                # Articles without a citation are skipped, not the whole batch
+                if metadata is not None:
+                    self._cache_put("pmid", metadata["pmid"], self._xml_tostring(article))
+                    results[metadata["pmid"]] = metadata
+                article.clear()
+
+        return results
+
+    @staticmethod
+    def _xml_fromstring(raw: bytes) -> ET.Element:
+        """Parse cached XML with the same library the live path uses."""
+        if LET is not None:
+            return LET.fromstring(raw, LET.XMLParser(**_LXML_PARSER_OPTIONS))
+        return SafeET.fromstring(raw)
+
+    @staticmethod
+    def _xml_tostring(elem: ET.Element) -> bytes:
+        """Serialize an element for the cache."""
+        return LET.tostring(elem) if LET is not None else ET.tostring(elem)
+
+    def _iter_xml(self, stream, tag: str):
+        """Incrementally parse an XML stream, yielding each `tag` element."""
+        if LET is not None:
+            for _, elem in LET.iterparse(stream, tag=tag, **_LXML_PARSER_OPTIONS):
+                yield elem
+                # Drop already-processed siblings so memory stays flat
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        else:
+            for _, elem in SafeET.iterparse(stream):
+                if elem.tag == tag:
+                    yield elem
+
+    def _parse_pubmed_article(self, article: ET.Element) -> dict | None:
+        """Build a metadata dictionary from a PubmedArticle element (None if it has no citation)."""
+        # Direct child paths only: ".//" would walk the whole subtree (and
+        # pick up ArticleIds from the reference list)
+        medline_citation = article.find("MedlineCitation")
+        article_elem = medline_citation.find("Article") if medline_citation is not None else None
+        if article_elem is None:
             return None
 
+        # Get DOI if available
+        doi = None
+        for article_id in article.iterfind("PubmedData/ArticleIdList/ArticleId"):
+            if article_id.get("IdType") == "doi":
+                doi = article_id.text
+                break
+
+        return {
+            "type": "pmid",
+            "entry_type": "article",
+            "pmid": medline_citation.findtext("PMID", ""),
+            "title": article_elem.findtext("ArticleTitle", ""),
+            "authors": self._format_authors_pubmed(article_elem.iterfind("AuthorList/Author")),
+            "year": self._extract_year_pubmed(article_elem),
+            "journal": article_elem.findtext("Journal/Title", ""),
+            "volume": article_elem.findtext("Journal/JournalIssue/Volume", ""),
+            "issue": article_elem.findtext("Journal/JournalIssue/Issue", ""),
+            "pages": article_elem.findtext("Pagination/MedlinePgn", ""),
+            "doi": doi,
+        }
+
     def extract_from_arxiv(self, arxiv_id: str) -> dict | None:
         """
         Extract metadata from arXiv ID using arXiv API.
@@ -214,62 +532,92 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = "http://export.arxiv.org/api/query"
-        params = {"id_list": arxiv_id, "max_results": 1}
+        metadata = self.extract_from_arxivs([arxiv_id]).get(arxiv_id)
+        if metadata is None:
+            print(f"Error: No entry found for arXiv ID: {arxiv_id}", file=sys.stderr)
+        return metadata
 
-        try:
-            response = self.session.get(url, params=params, timeout=15)
+    def extract_from_arxivs(self, arxiv_ids: list[str]) -> dict[str, dict]:
+        """
+        Extract metadata for many arXiv IDs, ARXIV_BATCH_SIZE per query.
 
-            if response.status_code == 200:
-                # Parse Atom XML
-                root = ET.fromstring(response.content)
-                ns = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
-
-                entry = root.find("atom:entry", ns)
-                if entry is None:
-                    print(f"Error: No entry found for arXiv ID: {arxiv_id}", file=sys.stderr)
-                    return None
-
-                # Extract DOI if published
-                doi_elem = entry.find("arxiv:doi", ns)
-                doi = doi_elem.text if doi_elem is not None else None
-
-                # Extract journal reference if published
-                journal_ref_elem = entry.find("arxiv:journal_ref", ns)
-                journal_ref = journal_ref_elem.text if journal_ref_elem is not None else None
-
-                # Get publication date
-                published = entry.findtext("atom:published", "", ns)
-                year = published[:4] if published else ""
-
-                # Get authors
-                authors = []
-                for author in entry.findall("atom:author", ns):
-                    name = author.findtext("atom:name", "", ns)
-                    if name:
-                        authors.append(name)
-
-                metadata = {
-                    "type": "arxiv",
-                    "entry_type": "misc" if not doi else "article",
-                    "arxiv_id": arxiv_id,
-                    "title": entry.findtext("atom:title", "", ns).strip().replace("\n", " "),
-                    "authors": " and ".join(authors),
-                    "year": year,
-                    "doi": doi,
-                    "journal_ref": journal_ref,
-                    "abstract": entry.findtext("atom:summary", "", ns).strip().replace("\n", " "),
-                    "url": f"https://arxiv.org/abs/{arxiv_id}",
-                }
-
-                return metadata
+        The Atom feed is streamed through iterparse, so large id_list
+        responses are never held in memory as a whole.
+
+        Args:
+            arxiv_ids: arXiv identifiers
+
+        Returns:
+            Dictionary mapping requested arXiv ID to metadata (misses omitted)
+        """
+        results = {}
+        misses = []
+        for arxiv_id in arxiv_ids:
+            cached = self._cache_get("arxiv", arxiv_id)
+            if cached is not None:
+                results[arxiv_id] = self._parse_arxiv_entry(self._xml_fromstring(cached), arxiv_id)
             else:
-                print(f"Error: arXiv API returned status {response.status_code} for ID: {arxiv_id}", file=sys.stderr)
-                return None
+                misses.append(arxiv_id)
 
-        except Exception as e:
-            print(f"Error extracting metadata from arXiv {arxiv_id}: {e}", file=sys.stderr)
-            return None
+        url = "http://export.arxiv.org/api/query"
+
+        for start in range(0, len(misses), self.ARXIV_BATCH_SIZE):
+            batch = misses[start : start + self.ARXIV_BATCH_SIZE]
+            params = {"id_list": ",".join(batch), "max_results": len(batch)}
+            requested = set(batch)
+
+            try:
+                with self._stream("GET", url, params=params, timeout=30) as response:
+                    if response.status_code != 200:
+                        print(f"Error: arXiv API returned status {response.status_code} for {len(batch)} IDs", file=sys.stderr)
+                        continue
+
+                    for entry in self._iter_xml(ChunkReader(response.iter_bytes()), ARXIV_ENTRY_TAG):
+                        # Entry IDs look like http://arxiv.org/abs/1706.03762v7;
+                        # match the requested form with or without the version
+                        entry_id = entry.findtext("atom:id", "", ARXIV_NS).rsplit("/abs/", 1)[-1]
+                        arxiv_id = entry_id if entry_id in requested else _ARXIV_VERSION_RE.sub("", entry_id)
+                        if arxiv_id in requested:
+                            self._cache_put("arxiv", arxiv_id, self._xml_tostring(entry))
+                            results[arxiv_id] = self._parse_arxiv_entry(entry, arxiv_id)
+                        entry.clear()
+
+            except Exception as e:
+                print(f"Error extracting metadata for {len(batch)} arXiv IDs: {e}", file=sys.stderr)
+
+        return results
+
+    def _parse_arxiv_entry(self, entry: ET.Element, arxiv_id: str) -> dict:
+        """Build a metadata dictionary from an arXiv Atom entry."""
+        ns = ARXIV_NS
+
+        # DOI and journal reference are only present once published
+        doi = entry.findtext("arxiv:doi", None, ns) or None
+        journal_ref = entry.findtext("arxiv:journal_ref", None, ns) or None
+
+        # Get publication date
+        published = entry.findtext("atom:published", "", ns)
+        year = published[:4] if published else ""
+
+        # Get authors
+        authors = []
+        for author in entry.findall("atom:author", ns):
+            name = author.findtext("atom:name", "", ns)
+            if name:
+                authors.append(name)
+
+        return {
+            "type": "arxiv",
+            "entry_type": "misc" if not doi else "article",
+            "arxiv_id": arxiv_id,
+            "title": entry.findtext("atom:title", "", ns).strip().replace("\n", " "),
+            "authors": " and ".join(authors),
+            "year": year,
+            "doi": doi,
+            "journal_ref": journal_ref,
+            "abstract": entry.findtext("atom:summary", "", ns).strip().replace("\n", " "),
+            "url": f"https://arxiv.org/abs/{arxiv_id}",
+        }
 
     def metadata_to_bibtex(self, metadata: dict, citation_key: str | None = None) -> str:
         """
@@ -287,98 +635,47 @@ class MetadataExtractor:
 
         entry_type = metadata.get("entry_type", "misc")
 
-        # Build BibTeX entry
-        lines = [f"@{entry_type}{{{citation_key},"]
-
-        # Add fields
-        if metadata.get("authors"):
-            lines.append(f'  author  = {{{metadata["authors"]}}},')
+        m = metadata
+        is_arxiv = m.get("type") == "arxiv"
 
-        if metadata.get("title"):
+        # Field order matters; entries with a falsy value are skipped
+        fields = [
+            ("author", m.get("authors")),
             # Protect capitalization
-            title = self._protect_title(metadata["title"])
-            lines.append(f"  title   = {{{title}}},")
-
-        if entry_type == "article" and metadata.get("journal"):
-            lines.append(f'  journal = {{{metadata["journal"]}}},')
-        elif entry_type == "misc" and metadata.get("type") == "arxiv":
-            lines.append("  howpublished = {arXiv},")
-
-        if metadata.get("year"):
-            lines.append(f'  year    = {{{metadata["year"]}}},')
-
-        if metadata.get("volume"):
-            lines.append(f'  volume  = {{{metadata["volume"]}}},')
-
-        if metadata.get("issue"):
-            lines.append(f'  number  = {{{metadata["issue"]}}},')
-
-        if metadata.get("pages"):
-            pages = metadata["pages"].replace("-", "--")  # En-dash
-            lines.append(f"  pages   = {{{pages}}},")
-
-        if metadata.get("doi"):
-            lines.append(f'  doi     = {{{metadata["doi"]}}},')
-        elif metadata.get("url"):
-            lines.append(f'  url     = {{{metadata["url"]}}},')
-
-        if metadata.get("pmid"):
-            lines.append(f'  note    = {{PMID: {metadata["pmid"]}}},')
-
-        if metadata.get("type") == "arxiv" and not metadata.get("doi"):
-            lines.append("  note    = {Preprint},")
-
-        # Remove trailing comma from last field
-        if lines[-1].endswith(","):
-            lines[-1] = lines[-1][:-1]
-
-        lines.append("}")
-
-        return "\n".join(lines)
-
-    def _crossref_type_to_bibtex(self, crossref_type: str) -> str:
-        """Map CrossRef type to BibTeX entry type."""
-        type_map = {
-            "journal-article": "article",
-            "book": "book",
-            "book-chapter": "incollection",
-            "proceedings-article": "inproceedings",
-            "posted-content": "misc",
-            "dataset": "misc",
-            "report": "techreport",
-        }
-        return type_map.get(crossref_type, "misc")
+            ("title", self._protect_title(m["title"]) if m.get("title") else None),
+            ("journal", m.get("journal") if entry_type == "article" else None),
+            ("howpublished", "arXiv" if entry_type == "misc" and is_arxiv else None),
+            ("year", m.get("year")),
+            ("volume", m.get("volume")),
+            ("number", m.get("issue")),
+            ("pages", m["pages"].replace("-", "--") if m.get("pages") else None),  # En-dash
+            ("doi", m.get("doi")),
+            ("url", m.get("url") if not m.get("doi") else None),
+            ("note", f"PMID: {m['pmid']}" if m.get("pmid") else None),
+            ("note", "Preprint" if is_arxiv and not m.get("doi") else None),
+        ]
+        body = ",\n".join(f"  {name:<7} = {{{value}}}" for name, value in fields if value)
+
+        if not body:
+            return f"@{entry_type}{{{citation_key}\n}}"
+        return f"@{entry_type}{{{citation_key},\n{body}\n}}"
 
     def _format_authors_crossref(self, authors: list[dict]) -> str:
         """Format author list from CrossRef data."""
         if not authors:
             return ""
 
-        formatted = []
-        for author in authors:
-            given = author.get("given", "")
-            family = author.get("family", "")
-            if family:
-                if given:
-                    formatted.append(f"{family}, {given}")
-                else:
-                    formatted.append(family)
-
-        return " and ".join(formatted)
+        # Missing keys yield None rather than allocating empty strings
+        return " and ".join(
+            f"{author['family']}, {author['given']}" if author.get("given") else author["family"]
+            for author in authors
+            if author.get("family")
+        )
 
-    def _format_authors_pubmed(self, authors: list) -> str:
+    def _format_authors_pubmed(self, authors: Iterable[ET.Element]) -> str:
         """Format author list from PubMed XML."""
-        formatted = []
-        for author in authors:
-            last_name = author.findtext(".//LastName", "")
-            fore_name = author.findtext(".//ForeName", "")
-            if last_name:
-                if fore_name:
-                    formatted.append(f"{last_name}, {fore_name}")
-                else:
-                    formatted.append(last_name)
-
-        return " and ".join(formatted)
+        names = ((author.findtext("LastName"), author.findtext("ForeName")) for author in authors)
+        return " and ".join(f"{last}, {fore}" if fore else last for last, fore in names if last)
 
     def _extract_year_crossref(self, message: dict) -> str:
         """Extract year from CrossRef message."""
@@ -393,11 +690,11 @@ class MetadataExtractor:
 
     def _extract_year_pubmed(self, article: ET.Element) -> str:
         """Extract year from PubMed XML."""
-        year = article.findtext(".//Journal/JournalIssue/PubDate/Year", "")
+        year = article.findtext("Journal/JournalIssue/PubDate/Year", "")
         if not year:
-            medline_date = article.findtext(".//Journal/JournalIssue/PubDate/MedlineDate", "")
+            medline_date = article.findtext("Journal/JournalIssue/PubDate/MedlineDate", "")
             if medline_date:
-                year_match = re.search(r"\d{4}", medline_date)
+                year_match = _YEAR_RE.search(medline_date)
                 if year_match:
                     year = year_match.group()
         return year
@@ -421,24 +718,19 @@ class MetadataExtractor:
             year = "XXXX"
 
         # Clean last name (remove special characters)
-        last_name = re.sub(r"[^a-zA-Z]", "", last_name)
+        last_name = _NONALPHA_RE.sub("", last_name)
 
         # Get keyword from title
         title = metadata.get("title", "")
-        words = re.findall(r"\b[a-zA-Z]{4,}\b", title)
+        words = _TITLE_WORD_RE.findall(title)
         keyword = words[0].lower() if words else "paper"
 
         return f"{last_name}{year}{keyword}"
 
     def _protect_title(self, title: str) -> str:
         """Protect capitalization in title for BibTeX."""
-        # Protect common acronyms and proper nouns
-        protected_words = ["DNA", "RNA", "CRISPR", "COVID", "HIV", "AIDS", "AlphaFold", "Python", "AI", "ML", "GPU", "CPU", "USA", "UK", "EU"]
-
-        for word in protected_words:
-            title = re.sub(rf"\b{word}\b", f"{{{word}}}", title, flags=re.IGNORECASE)
-
-        return title
+        # Protect common acronyms and proper nouns (one pass, canonical casing)
+        return _PROTECT_RE.sub(lambda m: f"{{{_PROTECTED_CANONICAL[m.group(1).lower()]}}}", title)
 
     def extract(self, identifier: str) -> str | None:
         """
@@ -471,6 +763,60 @@ class MetadataExtractor:
         else:
             return None
 
+    def extract_many(self, identifiers: list[str], max_workers: int = 8) -> list[str | None]:
+        """
+        Extract metadata for many identifiers and return BibTeX.
+
+        DOIs, PMIDs and arXiv IDs are looked up together through the batch
+        extractors; everything else goes through extract() on a thread pool,
+        bounded per host by the extractor's semaphores.
+
+        Args:
+            identifiers: DOIs, PMIDs, arXiv IDs, or URLs
+            max_workers: Threads for identifiers that cannot be batched
+
+        Returns:
+            BibTeX string or None for each identifier, in input order
+        """
+        # Bucket (input index, cleaned id) pairs by type in a single pass.
+        # Commas would split the CrossRef filter, so those DOIs go one by one.
+        typed = defaultdict(list)
+        for i, identifier in enumerate(identifiers):
+            id_type, clean_id = self.identify_type(identifier)
+            if id_type == "doi" and "," in clean_id:
+                id_type = "unbatched"
+            typed[id_type].append((i, clean_id))
+
+        batchers = (
+            ("doi", "DOIs", self.DOI_BATCH_SIZE, self.extract_from_dois),
+            ("pmid", "PMIDs", self.PMID_BATCH_SIZE, self.extract_from_pmids),
+            ("arxiv", "arXiv IDs", self.ARXIV_BATCH_SIZE, self.extract_from_arxivs),
+        )
+
+        results: list[str | None] = [None] * len(identifiers)
+        for id_type, label, batch_size, extract_batch in batchers:
+            entries = typed.pop(id_type, None)
+            if not entries:
+                continue
+            unique_ids = list(dict.fromkeys(clean_id for _, clean_id in entries))
+            print(f"Looking up {len(unique_ids)} {label} in batches of {batch_size}...", file=sys.stderr)
+            found = extract_batch(unique_ids)
+            for i, clean_id in entries:
+                metadata = found.get(clean_id.lower() if id_type == "doi" else clean_id)
+                if metadata:
+                    results[i] = self.metadata_to_bibtex(metadata)
+                else:
+                    print(f"Error: {id_type.upper()} not found: {clean_id}", file=sys.stderr)
+
+        individual = sorted(i for entries in typed.values() for i, _ in entries)
+        if individual:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                bibtex_entries = executor.map(self.extract, [identifiers[i] for i in individual])
+                for i, bibtex in zip(individual, bibtex_entries):
+                    results[i] = bibtex
+
+        return results
+
 
 def main():
     """Command-line interface."""
@@ -486,7 +832,9 @@ def main():
     parser.add_argument("-i", "--input", help="Input file with identifiers (one per line)")
     parser.add_argument("-o", "--output", help="Output file for BibTeX (default: stdout)")
     parser.add_argument("--format", choices=["bibtex", "json"], default="bibtex", help="Output format")
-    parser.add_argument("--email", help="Email for NCBI E-utilities (recommended)")
+    parser.add_argument("--email", help="Email for NCBI E-utilities and CrossRef (recommended)")
+    parser.add_argument("--no-cache", action="store_true", help=f"Do not read or write the response cache ({CACHE_DIR})")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel requests for identifiers that cannot be batched (default: 8)")
 
     args = parser.parse_args()
 
@@ -515,36 +863,29 @@ def main():
         sys.exit(1)
 
     # Extract metadata
-    extractor = MetadataExtractor(email=args.email)
-    bibtex_entries = []
-
-    for i, identifier in enumerate(identifiers):
-        print(f"\nProcessing {i+1}/{len(identifiers)}...", file=sys.stderr)
-        bibtex = extractor.extract(identifier)
-        if bibtex:
-            bibtex_entries.append(bibtex)
-
-        # Rate limiting
-        if i < len(identifiers) - 1:
-            time.sleep(0.5)
+    extractor = MetadataExtractor(email=args.email, use_cache=not args.no_cache)
+    try:
+        bibtex_entries = [bibtex for bibtex in extractor.extract_many(identifiers, max_workers=args.workers) if bibtex]
+    finally:
+        extractor.close()
 
     if not bibtex_entries:
         print("Error: No successful extractions", file=sys.stderr)
         sys.exit(1)
 
-    # Format output
+    # Format output (as UTF-8 bytes, written without re-encoding)
     if args.format == "bibtex":
-        output = "\n\n".join(bibtex_entries) + "\n"
+        output = ("\n\n".join(bibtex_entries) + "\n").encode()
     else:  # json
-        output = json.dumps({"count": len(bibtex_entries), "entries": bibtex_entries}, indent=2)
+        output = _dumps_indented({"count": len(bibtex_entries), "entries": bibtex_entries})
 
     # Write output
     if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
+        with open(args.output, "wb") as f:
             f.write(output)
         print(f"\nSuccessfully wrote {len(bibtex_entries)} entries to {args.output}", file=sys.stderr)
     else:
-        print(output)
+        sys.stdout.buffer.write(output + b"\n")
 
     print(f"\nExtracted {len(bibtex_entries)}/{len(identifiers)} entries", file=sys.stderr)
 
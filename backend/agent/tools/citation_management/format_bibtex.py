@@ -5,15 +5,59 @@ Format, clean, sort, and deduplicate BibTeX files.
 """
 
 import argparse
+import hashlib
+import json
+import os
 import re
 import sys
-from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from ._bibtex import read_entries
+    from ._common import read_cache, write_cache
+except ImportError:  # run as a script
+    from _bibtex import read_entries
+    from _common import read_cache, write_cache
+
+# Parsed entries are cached per file, keyed on its path and invalidated by a
+# change in modification time or size
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "aura" / "bibtex"
+
+# Compiled once; fix_common_issues runs these for every entry in the file
+_PAGE_RANGE_RE = re.compile(r"(\d)-(\d)")
+_PP_PREFIX_RE = re.compile(r"^pp\.\s*", re.IGNORECASE)
+_MULTI_AND_RE = re.compile(r"\s+and\s+and\s+")
+
+
+def _author_sort_key(entry: dict) -> str:
+    """Last name of the first author; entries without authors sort last."""
+    author = entry["fields"].get("author", "ZZZ")
+    if "," in author:
+        return author.split(",", 1)[0].lower()
+    words = author.split()
+    return words[0].lower() if words else "zzz"
+
+
+# Sort key per sort_by value, chosen once per sort rather than per entry
+_SORT_KEYS = {
+    "key": lambda entry: entry["key"].lower(),
+    "year": lambda entry: entry["fields"].get("year", "9999"),
+    "author": _author_sort_key,
+    "title": lambda entry: entry["fields"].get("title", "").lower(),
+}
 
 
 class BibTeXFormatter:
     """Format and clean BibTeX entries."""
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
+        """
+        Initialize formatter.
+
+        Args:
+            use_cache: Read and write the on-disk parsed-entry cache
+        """
+        self.use_cache = use_cache
         # Standard field order for readability
         self.field_order = [
             "author",
@@ -42,6 +86,8 @@ class BibTeXFormatter:
             "abstract",
             "keywords",
         ]
+        # Position of each standard field; others sort after, in input order
+        self._field_rank = {name: rank for rank, name in enumerate(self.field_order)}
 
     def parse_bibtex_file(self, filepath: str) -> list[dict]:
         """
@@ -54,41 +100,83 @@ class BibTeXFormatter:
             List of entry dictionaries
         """
         try:
-            with open(filepath, encoding="utf-8") as f:
-                content = f.read()
+            signature = self._file_signature(filepath)
+            entries = self._cache_get(filepath, signature)
+            if entries is None:
+                entries = list(self._read_entries(filepath))
+                self._cache_put(filepath, signature, entries)
+            return entries
         except Exception as e:
             print(f"Error reading file: {e}", file=sys.stderr)
             return []
 
-        entries = []
-
-        # Match BibTeX entries
-        pattern = r"@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}"
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
+    def iter_entries(self, filepath: str):
+        """
+        Stream entries from a BibTeX file (served from the cache when fresh).
 
-            # Parse fields
-            fields = OrderedDict()
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
+        Args:
+            filepath: Path to BibTeX file
 
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
+        Yields:
+            Entry dictionaries
+        """
+        cached = self._cache_get(filepath, self._file_signature(filepath))
+        if cached is not None:
+            yield from cached
+        else:
+            yield from self._read_entries(filepath)
+
+    @staticmethod
+    def _file_signature(filepath: str) -> list[int]:
+        """Modification time and size; any edit to the file changes it."""
+        stat = os.stat(filepath)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @staticmethod
+    def _cache_path(filepath: str) -> Path:
+        """Cache file for a .bib file."""
+        return CACHE_DIR / hashlib.sha1(os.path.abspath(filepath).encode()).hexdigest()
+
+    def _cache_get(self, filepath: str, signature: list[int]) -> list[dict] | None:
+        """Return cached entries, or None if missing or stale."""
+        if not self.use_cache:
+            return None
+
+        raw = read_cache(self._cache_path(filepath))
+        if raw is None:
+            return None
+        try:
+            cached = json.loads(raw)
+        except ValueError:
+            return None
+        if cached.get("signature") != signature:
+            return None
+        return cached["entries"]
+
+    def _cache_put(self, filepath: str, signature: list[int], entries: list[dict]) -> None:
+        """Store parsed entries (best effort, atomic)."""
+        if not self.use_cache:
+            return
 
-                fields[field_name] = field_value.strip()
+        record = json.dumps({"signature": signature, "entries": entries}).encode()
+        try:
+            write_cache(self._cache_path(filepath), record)
+        except OSError as e:
+            print(f"Warning: Could not write cache for {filepath}: {e}", file=sys.stderr)
 
-            entries.append({"type": entry_type, "key": citation_key, "fields": fields})
+    def _read_entries(self, filepath: str):
+        """
+        Stream entries from a BibTeX file.
 
-        return entries
+        Malformed entries carry their text as "raw" and are written back
+        unchanged.
+        """
+        for entry_type, key, fields, text in read_entries(filepath):
+            if fields is None:
+                print(f"Warning: Entry {key} has unbalanced braces or quotes; kept unchanged", file=sys.stderr)
+                yield {"type": entry_type, "key": key, "fields": {}, "raw": text}
+            else:
+                yield {"type": entry_type, "key": key, "fields": fields}
 
     def format_entry(self, entry: dict) -> str:
         """
@@ -98,85 +186,76 @@ class BibTeXFormatter:
             entry: Entry dictionary
 
         Returns:
-            Formatted BibTeX string
+            Formatted BibTeX string (malformed entries keep their original text)
         """
-        lines = [f'@{entry["type"]}{{{entry["key"]},']
-
-        # Order fields according to standard order
-        ordered_fields = OrderedDict()
+        if "raw" in entry:
+            return entry["raw"]
 
-        # Add fields in standard order
-        for field_name in self.field_order:
-            if field_name in entry["fields"]:
-                ordered_fields[field_name] = entry["fields"][field_name]
+        # Order fields according to standard order (sorted() is stable, so
+        # remaining fields keep their original order at the end)
+        rank = self._field_rank
+        unranked = len(rank)
+        ordered_fields = sorted(entry["fields"].items(), key=lambda item: rank.get(item[0], unranked))
 
-        # Add any remaining fields
-        for field_name, field_value in entry["fields"].items():
-            if field_name not in ordered_fields:
-                ordered_fields[field_name] = field_value
+        header = f'@{entry["type"]}{{{entry["key"]}'
+        if not ordered_fields:
+            return f"{header}\n}}"
 
-        # Format each field
-        max_field_len = max(len(f) for f in ordered_fields.keys()) if ordered_fields else 0
+        # Format each field, padding names for alignment; joining with ",\n"
+        # leaves no trailing comma to strip
+        max_field_len = max(len(name) for name, _ in ordered_fields)
+        body = ",\n".join([f"  {name.ljust(max_field_len)} = {{{value}}}" for name, value in ordered_fields])
 
-        for field_name, field_value in ordered_fields.items():
-            # Pad field name for alignment
-            padded_field = field_name.ljust(max_field_len)
-            lines.append(f"  {padded_field} = {{{field_value}}},")
-
-        # Remove trailing comma from last field
-        if lines[-1].endswith(","):
-            lines[-1] = lines[-1][:-1]
-
-        lines.append("}")
-
-        return "\n".join(lines)
+        return f"{header},\n{body}\n}}"
 
     def fix_common_issues(self, entry: dict) -> dict:
         """
-        Fix common formatting issues in entry.
+        Fix common formatting issues in entry, in place.
 
         Args:
-            entry: Entry dictionary
+            entry: Entry dictionary (its fields are updated)
 
         Returns:
-            Fixed entry dictionary
+            The same entry, for chaining
         """
-        fixed = entry.copy()
-        fields = fixed["fields"].copy()
+        fields = entry["fields"]
+
+        # Cheap substring checks gate each fix so clean fields never reach
+        # the regex engine or allocate a new string
 
         # Fix page ranges (single hyphen to double hyphen)
         if "pages" in fields:
             pages = fields["pages"]
             # Replace single hyphen with double hyphen if it's a range
-            if re.search(r"\d-\d", pages) and "--" not in pages:
-                pages = re.sub(r"(\d)-(\d)", r"\1--\2", pages)
+            if "-" in pages and "--" not in pages and _PAGE_RANGE_RE.search(pages):
+                pages = _PAGE_RANGE_RE.sub(r"\1--\2", pages)
                 fields["pages"] = pages
 
-        # Remove "pp." from pages
-        if "pages" in fields:
-            pages = fields["pages"]
-            pages = re.sub(r"^pp\.\s*", "", pages, flags=re.IGNORECASE)
-            fields["pages"] = pages
+            # Remove "pp." from pages
+            if pages[:3].lower() == "pp.":
+                fields["pages"] = _PP_PREFIX_RE.sub("", pages)
 
         # Fix DOI (remove URL prefix if present)
         if "doi" in fields:
             doi = fields["doi"]
-            doi = doi.replace("https://doi.org/", "")
-            doi = doi.replace("http://doi.org/", "")
-            doi = doi.replace("doi:", "")
-            fields["doi"] = doi
+            if "doi.org/" in doi or "doi:" in doi:
+                doi = doi.replace("https://doi.org/", "")
+                doi = doi.replace("http://doi.org/", "")
+                doi = doi.replace("doi:", "")
+                fields["doi"] = doi
 
         # Fix author separators (semicolon or ampersand to 'and')
         if "author" in fields:
             author = fields["author"]
-            author = author.replace(";", " and")
-            author = author.replace(" & ", " and ")
-            # Clean up multiple 'and's
-            author = re.sub(r"\s+and\s+and\s+", " and ", author)
+            if ";" in author or " & " in author:
+                author = author.replace(";", " and")
+                author = author.replace(" & ", " and ")
+            # Clean up multiple 'and's (needs at least two to match)
+            if author.count("and") > 1:
+                author = _MULTI_AND_RE.sub(" and ", author)
             fields["author"] = author
 
-        fixed["fields"] = fields
-        return fixed
+        return entry
 
     def deduplicate_entries(self, entries: list[dict]) -> list[dict]:
         """
@@ -188,28 +267,48 @@ class BibTeXFormatter:
         Returns:
             List of unique entries
         """
+        # Strip each DOI once; both the check below and the main loop reuse them
+        dois = [entry["fields"].get("doi", "").strip() for entry in entries]
+
+        # Without DOIs only keys matter: keep first occurrences in one
+        # comprehension (set.add returns None, so the `or` never drops a first)
+        if not any(dois):
+            seen_keys = set()
+            unique_entries = [entry for entry in entries if not (entry["key"] in seen_keys or seen_keys.add(entry["key"]))]
+            if len(unique_entries) < len(entries):
+                kept = set(map(id, unique_entries))
+                sys.stderr.write(
+                    "".join(f"Duplicate citation key found: {entry['key']} (skipping)\n" for entry in entries if id(entry) not in kept)
+                )
+            return unique_entries
+
         seen_dois = set()
         seen_keys = set()
         unique_entries = []
+        # Bound methods and a single stderr write keep the loop tight on large files
+        add_doi, add_key, keep = seen_dois.add, seen_keys.add, unique_entries.append
+        duplicates = []
 
-        for entry in entries:
-            doi = entry["fields"].get("doi", "").strip()
+        for entry, doi in zip(entries, dois):
             key = entry["key"]
 
             # Check DOI first (more reliable)
             if doi:
                 if doi in seen_dois:
-                    print(f"Duplicate DOI found: {doi} (skipping {key})", file=sys.stderr)
+                    duplicates.append(f"Duplicate DOI found: {doi} (skipping {key})")
                     continue
-                seen_dois.add(doi)
+                add_doi(doi)
 
             # Check citation key
             if key in seen_keys:
-                print(f"Duplicate citation key found: {key} (skipping)", file=sys.stderr)
+                duplicates.append(f"Duplicate citation key found: {key} (skipping)")
                 continue
-            seen_keys.add(key)
+            add_key(key)
+
+            keep(entry)
 
-            unique_entries.append(entry)
+        if duplicates:
+            sys.stderr.write("\n".join(duplicates) + "\n")
 
         return unique_entries
 
@@ -225,26 +324,9 @@ class BibTeXFormatter:
         Returns:
             Sorted list of entries
         """
-
-        def get_sort_key(entry: dict) -> str:
-            if sort_by == "key":
-                return entry["key"].lower()
-            elif sort_by == "year":
-                year = entry["fields"].get("year", "9999")
-                return year
-            elif sort_by == "author":
-                author = entry["fields"].get("author", "ZZZ")
-                # Get last name of first author
-                if "," in author:
-                    return author.split(",")[0].lower()
-                else:
-                    return author.split()[0].lower() if author else "zzz"
-            elif sort_by == "title":
-                return entry["fields"].get("title", "").lower()
-            else:
-                return entry["key"].lower()
-
-        return sorted(entries, key=get_sort_key, reverse=descending)
+        # sorted() evaluates the key once per entry (decorate-sort-undecorate)
+        sort_key = _SORT_KEYS.get(sort_by, _SORT_KEYS["key"])
+        return sorted(entries, key=sort_key, reverse=descending)
 
     def format_file(
         self,
@@ -267,18 +349,37 @@ class BibTeXFormatter:
             fix_issues: Fix common formatting issues
         """
         print(f"Parsing {filepath}...", file=sys.stderr)
-        entries = self.parse_bibtex_file(filepath)
 
-        if not entries:
-            print("No entries found", file=sys.stderr)
-            return
-
-        print(f"Found {len(entries)} entries", file=sys.stderr)
+        # Deduplication and sorting need every entry at once; otherwise
+        # entries stream from the input straight to the output file
+        if deduplicate or sort_by:
+            entries = self.parse_bibtex_file(filepath)
+
+            if not entries:
+                print("No entries found", file=sys.stderr)
+                return
+
+            print(f"Found {len(entries)} entries", file=sys.stderr)
+        else:
+            # Report a missing or unreadable input as parse_bibtex_file does,
+            # before any output is started
+            try:
+                with open(filepath, "rb"):
+                    pass
+            except OSError as e:
+                print(f"Error reading file: {e}", file=sys.stderr)
+                print("No entries found", file=sys.stderr)
+                return
+            entries = self.iter_entries(filepath)
 
         # Fix common issues
         if fix_issues:
             print("Fixing common issues...", file=sys.stderr)
-            entries = [self.fix_common_issues(e) for e in entries]
+            if isinstance(entries, list):
+                for entry in entries:
+                    self.fix_common_issues(entry)
+            else:
+                entries = map(self.fix_common_issues, entries)
 
         # Deduplicate
         if deduplicate:
@@ -294,18 +395,34 @@ class BibTeXFormatter:
             print(f"Sorting by {sort_by}...", file=sys.stderr)
             entries = self.sort_entries(entries, sort_by, descending)
 
-        # Format entries
+        # Format entries into a temporary file, which replaces the output
+        # only once complete (the input may still be streaming from it)
         print("Formatting entries...", file=sys.stderr)
-        formatted_entries = [self.format_entry(e) for e in entries]
-
-        # Write output
-        output_content = "\n\n".join(formatted_entries) + "\n"
-
         output_file = output or filepath
+        tmp_file = f"{output_file}.tmp"
+        count = 0
         try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(output_content)
-            print(f"Successfully wrote {len(entries)} entries to {output_file}", file=sys.stderr)
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for formatted in map(self.format_entry, entries):
+                    if count:
+                        f.write("\n\n")
+                    f.write(formatted)
+                    count += 1
+                f.write("\n")
+        except BaseException:
+            # Covers read errors from a streamed input; the output is untouched
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+
+        if not count:
+            os.remove(tmp_file)
+            print("No entries found", file=sys.stderr)
+            return
+
+        try:
+            os.replace(tmp_file, output_file)
+            print(f"Successfully wrote {count} entries to {output_file}", file=sys.stderr)
         except Exception as e:
             print(f"Error writing file: {e}", file=sys.stderr)
             sys.exit(1)
@@ -330,13 +447,19 @@ def main():
 
     parser.add_argument("--no-fix", action="store_true", help="Do not fix common issues")
 
+    parser.add_argument("--no-cache", action="store_true", help=f"Do not read or write the parsed-entry cache ({CACHE_DIR})")
+
     args = parser.parse_args()
 
     # Format file
-    formatter = BibTeXFormatter()
-    formatter.format_file(
-        args.file, output=args.output, deduplicate=args.deduplicate, sort_by=args.sort, descending=args.descending, fix_issues=not args.no_fix
-    )
+    formatter = BibTeXFormatter(use_cache=not args.no_cache)
+    try:
+        formatter.format_file(
+            args.file, output=args.output, deduplicate=args.deduplicate, sort_by=args.sort, descending=args.descending, fix_issues=not args.no_fix
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error formatting {args.file}: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
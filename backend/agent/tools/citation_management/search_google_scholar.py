@@ -8,9 +8,13 @@ Install with: pip install scholarly
 """
 
 import argparse
+import itertools
 import json
+import queue
 import random
+import re
 import sys
+import threading
 import time
 
 try:
@@ -21,6 +25,61 @@ except ImportError:
     SCHOLARLY_AVAILABLE = False
     print("Warning: scholarly library not installed. Install with: pip install scholarly", file=sys.stderr)
 
+# Results between progress updates (written in place with \r)
+PROGRESS_EVERY = 5
+
+# Results fetched ahead of the consumer by the background thread
+PREFETCH_DEPTH = 10
+
+# First word of 4+ letters in a title becomes the citation key's keyword
+_KEYWORD_RE = re.compile(r"\b[a-zA-Z]{4,}\b")
+
+
+def _prefetch(iterable, depth: int = PREFETCH_DEPTH):
+    """
+    Yield items from iterable while a background thread fetches ahead.
+
+    Up to depth items are buffered, so the producer's network round trips
+    overlap with the consumer's processing and sleeps. An exception raised
+    by the iterable is re-raised in the consumer once the items before it
+    have been yielded.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        # Time out periodically so an abandoned consumer doesn't strand us
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((done, e))
+        else:
+            put((done, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
 
 class GoogleScholarSearcher:
     """Search Google Scholar using scholarly library."""
@@ -69,16 +128,18 @@ class GoogleScholarSearcher:
         print(f"Max results: {max_results}", file=sys.stderr)
 
         results = []
+        retrieved = 0
 
         try:
-            # Perform search
-            search_query = scholarly.search_pubs(query)
+            # Perform search; results are fetched in the background while
+            # this loop processes and paces the ones already retrieved
+            search_query = itertools.islice(scholarly.search_pubs(query), max_results)
 
-            for i, result in enumerate(search_query):
-                if i >= max_results:
-                    break
-
-                print(f"Retrieved {i+1}/{max_results}", file=sys.stderr)
+            for i, result in enumerate(_prefetch(search_query)):
+                retrieved = i + 1
+                if retrieved % PROGRESS_EVERY == 0:
+                    sys.stderr.write(f"\rRetrieved {retrieved}/{max_results}")
+                    sys.stderr.flush()
 
                 # Extract metadata
                 metadata = {
@@ -109,7 +170,15 @@ class GoogleScholarSearcher:
                 time.sleep(random.uniform(2, 5))
 
         except Exception as e:
-            print(f"Error during search: {e}", file=sys.stderr)
+            error = e
+        else:
+            error = None
+
+        # Final count, ending the in-place progress line
+        if retrieved:
+            sys.stderr.write(f"\rRetrieved {retrieved}/{max_results}\n")
+        if error is not None:
+            print(f"Error during search: {error}", file=sys.stderr)
 
         # Sort if requested
         if sort_by == "citations" and results:
@@ -129,11 +198,9 @@ class GoogleScholarSearcher:
         year = metadata.get("year", "XXXX")
 
         # Get keyword from title
-        import re
-
         title = metadata.get("title", "")
-        words = re.findall(r"\b[a-zA-Z]{4,}\b", title)
-        keyword = words[0].lower() if words else "paper"
+        word = _KEYWORD_RE.search(title)
+        keyword = word.group().lower() if word else "paper"
 
         citation_key = f"{last_name}{year}{keyword}"
 
@@ -5,34 +5,190 @@ Search PubMed using E-utilities API and export results.
 """
 
 import argparse
+import hashlib
 import json
 import os
+import platform
+import re
 import sys
-import time
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
 
-import requests
+import httpx
+
+try:
+    from ._common import HTTP2_AVAILABLE, ChunkReader, RequestPacer, read_cache, send_with_retries, write_cache
+except ImportError:  # run as a script
+    from _common import HTTP2_AVAILABLE, ChunkReader, RequestPacer, read_cache, send_with_retries, write_cache
+
+# lxml is used when installed, except on PyPy: there it runs through the
+# slow C-API emulation layer, while the stdlib parser is JIT-compiled
+if platform.python_implementation() == "PyPy":
+    LET = None
+else:
+    try:
+        from lxml import etree as LET
+    except ImportError:
+        LET = None
+
+# Never expand entities or fetch external resources while parsing API responses
+_LXML_PARSER_OPTIONS = {"resolve_entities": False, "no_network": True, "huge_tree": False}
+
+# Reports are serialized with orjson when it is installed
+try:
+    import orjson
+
+    def _dumps_indented(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+
+    def _dumps_indented(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+# Parsed EFetch records are cached on disk by PMID, so repeated or
+# overlapping searches only fetch PMIDs not seen before
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "aura" / "pubmed"
+CACHE_TTL = 90 * 24 * 3600  # seconds
+# Bump when the metadata dictionary changes shape to invalidate old records
+CACHE_VERSION = 1
+# Records a searcher keeps in memory (least recently used dropped first), so
+# repeated searches in one process skip EFetch and the disk cache alike
+MEMORY_CACHE_SIZE = 10000
+
+_YEAR_RE = re.compile(r"\d{4}")
 
 
 class PubMedSearcher:
     """Search PubMed using NCBI E-utilities API."""
 
-    def __init__(self, api_key: str | None = None, email: str | None = None):
+    # PMIDs per EFetch request (sent as a POST body, so not bound by URL length)
+    PMID_BATCH_SIZE = 500
+
+    # Compiled XPath expressions, evaluated in libxml2 without re-parsing the
+    # path per call. string(...) yields "" when the node is missing. Paths
+    # follow the fixed PubmedArticle schema child by child: ".//" would walk
+    # whole subtrees (and pick up DOIs from the reference list).
+    if LET is not None:
+        _X_PMID = LET.XPath("string(PMID)")
+        _X_DOI = LET.XPath('string(PubmedData/ArticleIdList/ArticleId[@IdType="doi"])')
+        _X_AUTHORS = LET.XPath("AuthorList/Author")
+        _X_AUTHOR_COUNT = LET.XPath("count(AuthorList/Author)")
+        _X_LAST_NAMES = LET.XPath("AuthorList/Author/LastName/text()", smart_strings=False)
+        _X_FORE_NAMES = LET.XPath("AuthorList/Author/ForeName/text()", smart_strings=False)
+        _X_LAST_NAME = LET.XPath("string(LastName)")
+        _X_FORE_NAME = LET.XPath("string(ForeName)")
+        _X_YEAR = LET.XPath("string(Journal/JournalIssue/PubDate/Year)")
+        _X_MEDLINE_DATE = LET.XPath("string(Journal/JournalIssue/PubDate/MedlineDate)")
+        _X_TITLE = LET.XPath("string(ArticleTitle)")
+        _X_JOURNAL = LET.XPath("string(Title)")
+        _X_VOLUME = LET.XPath("string(JournalIssue/Volume)")
+        _X_ISSUE = LET.XPath("string(JournalIssue/Issue)")
+        _X_PAGES = LET.XPath("string(Pagination/MedlinePgn)")
+        _X_ABSTRACT = LET.XPath("string(Abstract/AbstractText)")
+
+    def __init__(self, api_key: str | None = None, email: str | None = None, use_cache: bool = True):
         """
         Initialize searcher.
 
         Args:
             api_key: NCBI API key (optional but recommended)
             email: Email for Entrez (optional but recommended)
+            use_cache: Read and write the on-disk metadata cache
         """
         self.api_key = api_key or os.getenv("NCBI_API_KEY", "")
         self.email = email or os.getenv("NCBI_EMAIL", "")
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
-        self.session = requests.Session()
+        # One pooled client shared by the batch workers; over HTTP/2 their
+        # requests are multiplexed on a single connection
+        self.client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+            timeout=30.0,
+        )
+        self.use_cache = use_cache
+        self._recent: OrderedDict[str, dict] = OrderedDict()
 
         # Rate limiting
         self.delay = 0.11 if self.api_key else 0.34  # 10/sec with key, 3/sec without
+        self.max_workers = 10 if self.api_key else 3
+        # Request pacing shared by the batch workers
+        self._pacer = RequestPacer({httpx.URL(self.base_url).host: self.delay})
+
+    @staticmethod
+    def _cache_path(pmid: str) -> Path:
+        """Cache file for a PMID."""
+        return CACHE_DIR / hashlib.sha1(pmid.encode()).hexdigest()
+
+    def _cache_get(self, pmid: str) -> dict | None:
+        """Return cached metadata, or None if missing, expired or outdated."""
+        if not self.use_cache:
+            return None
+
+        raw = read_cache(self._cache_path(pmid), CACHE_TTL)
+        if raw is None:
+            return None
+        try:
+            cached = json.loads(raw)
+        except ValueError:
+            return None
+        if cached.get("version") != CACHE_VERSION:
+            return None
+        return cached["metadata"]
+
+    def _cache_put(self, pmid: str, metadata: dict) -> None:
+        """Store parsed metadata (best effort, atomic)."""
+        if not self.use_cache:
+            return
+
+        record = json.dumps({"version": CACHE_VERSION, "metadata": metadata}).encode()
+        try:
+            write_cache(self._cache_path(pmid), record)
+        except OSError as e:
+            print(f"Warning: Could not write cache for PMID {pmid}: {e}", file=sys.stderr)
+
+    def _recall(self, pmid: str) -> dict | None:
+        """Return a copy of metadata this searcher fetched before, if still held."""
+        metadata = self._recent.get(pmid)
+        if metadata is None:
+            return None
+        self._recent.move_to_end(pmid)
+        return dict(metadata)
+
+    def _remember(self, metadata_list: list[dict]) -> None:
+        """Hold copies of metadata in the in-memory LRU (called from the caller's thread)."""
+        recent = self._recent
+        for metadata in metadata_list:
+            pmid = metadata["pmid"]
+            if pmid:
+                recent[pmid] = dict(metadata)
+                recent.move_to_end(pmid)
+        while len(recent) > MEMORY_CACHE_SIZE:
+            recent.popitem(last=False)
+
+    def close(self) -> None:
+        """Close the pooled HTTP client."""
+        self.client.close()
+
+    @contextmanager
+    def _stream(self, method: str, url: str, **kwargs) -> Iterator[httpx.Response]:
+        """Send a request and yield the response with its body unread."""
+        response = self._send(method, url, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+
+    def _send(self, method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+        """Send with retries on transient errors, pacing each attempt to the rate limit."""
+        request = self.client.build_request(method, url, **kwargs)
+        # The last response is left to raise_for_status
+        return send_with_retries(self.client, request, self._pacer, stream=stream)
 
     def search(
         self,
@@ -81,7 +237,7 @@ class PubMedSearcher:
             params["api_key"] = self.api_key
 
         try:
-            response = self.session.get(esearch_url, params=params, timeout=30)
+            response = self._send("GET", esearch_url, params=params, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -109,97 +265,142 @@ class PubMedSearcher:
         if not pmids:
             return []
 
-        metadata_list = []
-
-        # Fetch in batches of 200
-        batch_size = 200
-        for i in range(0, len(pmids), batch_size):
-            batch = pmids[i : i + batch_size]
-            print(f"Fetching metadata for PMIDs {i+1}-{min(i+batch_size, len(pmids))}...", file=sys.stderr)
-
-            efetch_url = self.base_url + "efetch.fcgi"
-            params = {"db": "pubmed", "id": ",".join(batch), "retmode": "xml", "rettype": "abstract"}
+        # Serve PMIDs seen before (in this process, then on disk) locally;
+        # only the rest go to EFetch
+        by_pmid = {}
+        loaded = []
+        misses = []
+        for pmid in pmids:
+            cached = self._recall(pmid)
+            if cached is None:
+                cached = self._cache_get(pmid)
+                if cached is not None:
+                    loaded.append(cached)
+            if cached is not None:
+                by_pmid[pmid] = cached
+            else:
+                misses.append(pmid)
+        self._remember(loaded)
+        if by_pmid:
+            print(f"Using cached metadata for {len(by_pmid)} PMIDs", file=sys.stderr)
+        if not misses:
+            return [by_pmid[pmid] for pmid in pmids]
+
+        # Fetch in batches. Batches run concurrently, paced by the shared pacer,
+        # and are concatenated in order so the output matches a sequential
+        # fetch.
+        batch_size = self.PMID_BATCH_SIZE
+        starts = range(0, len(misses), batch_size)
+        batches = [misses[i : i + batch_size] for i in starts]
+
+        with ThreadPoolExecutor(max_workers=min(len(batches), self.max_workers)) as executor:
+            results = executor.map(self._fetch_batch, starts, batches)
+            fetched = [metadata for batch_metadata in results for metadata in batch_metadata]
+
+        self._remember(fetched)
+        if not by_pmid:
+            return fetched
+        # Merge back into search order
+        by_pmid.update((metadata["pmid"], metadata) for metadata in fetched)
+        return [by_pmid[pmid] for pmid in pmids if pmid in by_pmid]
+
+    def _fetch_batch(self, start: int, batch: list[str]) -> list[dict]:
+        """Fetch and parse one EFetch batch (errors are reported, not raised)."""
+        # One write per line so concurrent batches don't interleave output
+        sys.stderr.write(f"Fetching metadata for PMIDs {start+1}-{start+len(batch)}...\n")
+
+        efetch_url = self.base_url + "efetch.fcgi"
+        params = {"db": "pubmed", "id": ",".join(batch), "retmode": "xml", "rettype": "abstract"}
 
-            if self.email:
-                params["email"] = self.email
-            if self.api_key:
-                params["api_key"] = self.api_key
+        if self.email:
+            params["email"] = self.email
+        if self.api_key:
+            params["api_key"] = self.api_key
 
-            try:
-                response = self.session.get(efetch_url, params=params, timeout=60)
+        metadata_list = []
+        try:
+            # The ID list goes in a POST body, so the URL stays short whatever
+            # the batch size. The XML is parsed as it arrives instead of
+            # buffering the whole batch.
+            with self._stream("POST", efetch_url, data=params, timeout=60) as response:
                 response.raise_for_status()
 
-                # Parse XML
-                root = ET.fromstring(response.content)
-                articles = root.findall(".//PubmedArticle")
-
-                for article in articles:
+                for article in self._iter_articles(ChunkReader(response.iter_bytes())):
                     metadata = self._extract_metadata_from_xml(article)
                     if metadata:
                         metadata_list.append(metadata)
+                        if metadata["pmid"]:
+                            self._cache_put(metadata["pmid"], metadata)
+                    article.clear()
 
-                # Rate limiting
-                time.sleep(self.delay)
-
-            except Exception as e:
-                print(f"Error fetching metadata for batch: {e}", file=sys.stderr)
-                continue
+        except Exception as e:
+            print(f"Error fetching metadata for batch: {e}", file=sys.stderr)
 
         return metadata_list
 
+    @staticmethod
+    def _iter_articles(stream):
+        """Incrementally parse an EFetch response, yielding each PubmedArticle."""
+        if LET is not None:
+            for _, elem in LET.iterparse(stream, tag="PubmedArticle", **_LXML_PARSER_OPTIONS):
+                yield elem
+                # Drop already-processed siblings so memory stays flat
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        else:
+            for _, elem in ET.iterparse(stream):
+                if elem.tag == "PubmedArticle":
+                    yield elem
+
     def _extract_metadata_from_xml(self, article: ET.Element) -> dict | None:
         """Extract metadata from PubmedArticle XML element."""
+        if LET is not None:
+            return self._extract_metadata_xpath(article)
+
         try:
-            medline_citation = article.find(".//MedlineCitation")
-            article_elem = medline_citation.find(".//Article")
-            journal = article_elem.find(".//Journal")
+            # Direct child paths only (see the compiled XPaths above)
+            medline_citation = article.find("MedlineCitation")
+            article_elem = medline_citation.find("Article")
+            journal = article_elem.find("Journal")
 
             # Get PMID
-            pmid = medline_citation.findtext(".//PMID", "")
+            pmid = medline_citation.findtext("PMID", "")
 
             # Get DOI
-            doi = None
-            article_ids = article.findall(".//ArticleId")
-            for article_id in article_ids:
-                if article_id.get("IdType") == "doi":
-                    doi = article_id.text
-                    break
+            doi_elem = article.find("PubmedData/ArticleIdList/ArticleId[@IdType='doi']")
+            doi = doi_elem.text if doi_elem is not None else None
 
             # Get authors
             authors = []
-            author_list = article_elem.find(".//AuthorList")
-            if author_list is not None:
-                for author in author_list.findall(".//Author"):
-                    last_name = author.findtext(".//LastName", "")
-                    fore_name = author.findtext(".//ForeName", "")
-                    if last_name:
-                        if fore_name:
-                            authors.append(f"{last_name}, {fore_name}")
-                        else:
-                            authors.append(last_name)
+            for author in article_elem.iterfind("AuthorList/Author"):
+                last_name = author.findtext("LastName", "")
+                fore_name = author.findtext("ForeName", "")
+                if last_name:
+                    if fore_name:
+                        authors.append(f"{last_name}, {fore_name}")
+                    else:
+                        authors.append(last_name)
 
             # Get year
-            year = article_elem.findtext(".//Journal/JournalIssue/PubDate/Year", "")
+            year = article_elem.findtext("Journal/JournalIssue/PubDate/Year", "")
             if not year:
-                medline_date = article_elem.findtext(".//Journal/JournalIssue/PubDate/MedlineDate", "")
+                medline_date = article_elem.findtext("Journal/JournalIssue/PubDate/MedlineDate", "")
                 if medline_date:
-                    import re
-
-                    year_match = re.search(r"\d{4}", medline_date)
+                    year_match = _YEAR_RE.search(medline_date)
                     if year_match:
                         year = year_match.group()
 
             metadata = {
                 "pmid": pmid,
                 "doi": doi,
-                "title": article_elem.findtext(".//ArticleTitle", ""),
+                "title": self._full_text(article_elem.find("ArticleTitle")),
                 "authors": " and ".join(authors),
-                "journal": journal.findtext(".//Title", ""),
+                "journal": journal.findtext("Title", ""),
                 "year": year,
-                "volume": journal.findtext(".//JournalIssue/Volume", ""),
-                "issue": journal.findtext(".//JournalIssue/Issue", ""),
-                "pages": article_elem.findtext(".//Pagination/MedlinePgn", ""),
-                "abstract": article_elem.findtext(".//Abstract/AbstractText", ""),
+                "volume": journal.findtext("JournalIssue/Volume", ""),
+                "issue": journal.findtext("JournalIssue/Issue", ""),
+                "pages": article_elem.findtext("Pagination/MedlinePgn", ""),
+                "abstract": self._full_text(article_elem.find("Abstract/AbstractText")),
             }
 
             return metadata
@@ -208,59 +409,103 @@ class PubMedSearcher:
             print(f"Error extracting metadata: {e}", file=sys.stderr)
             return None
 
-    def metadata_to_bibtex(self, metadata: dict) -> str:
-        """Convert metadata to BibTeX format."""
-        # Generate citation key
-        if metadata.get("authors"):
-            first_author = metadata["authors"].split(" and ")[0]
+    @staticmethod
+    def _full_text(elem: ET.Element | None) -> str:
+        """Text of an element including inline markup (<i>, <sup>), as XPath string() gives."""
+        return "".join(elem.itertext()) if elem is not None else ""
+
+    def _extract_metadata_xpath(self, article) -> dict | None:
+        """Extract metadata from a PubmedArticle lxml element using the compiled XPaths."""
+        try:
+            medline_citation = article.find("MedlineCitation")
+            article_elem = medline_citation.find("Article")
+            journal = article_elem.find("Journal")
+
+            # Get authors: when every author has exactly one plain-text
+            # LastName and ForeName, two list-valued XPaths give the names in
+            # order; anything else (collective names, missing or marked-up
+            # parts) falls back to one author at a time
+            last_names = self._X_LAST_NAMES(article_elem)
+            fore_names = self._X_FORE_NAMES(article_elem)
+            if len(last_names) == len(fore_names) == self._X_AUTHOR_COUNT(article_elem):
+                authors = [f"{last_name}, {fore_name}" for last_name, fore_name in zip(last_names, fore_names)]
+            else:
+                authors = []
+                for author in self._X_AUTHORS(article_elem):
+                    last_name = self._X_LAST_NAME(author)
+                    fore_name = self._X_FORE_NAME(author)
+                    if last_name:
+                        authors.append(f"{last_name}, {fore_name}" if fore_name else last_name)
+
+            # Get year
+            year = self._X_YEAR(article_elem)
+            if not year:
+                year_match = _YEAR_RE.search(self._X_MEDLINE_DATE(article_elem))
+                if year_match:
+                    year = year_match.group()
+
+            return {
+                "pmid": self._X_PMID(medline_citation),
+                "doi": self._X_DOI(article) or None,
+                "title": self._X_TITLE(article_elem),
+                "authors": " and ".join(authors),
+                "journal": self._X_JOURNAL(journal),
+                "year": year,
+                "volume": self._X_VOLUME(journal),
+                "issue": self._X_ISSUE(journal),
+                "pages": self._X_PAGES(article_elem),
+                "abstract": self._X_ABSTRACT(article_elem),
+            }
+
+        except Exception as e:
+            print(f"Error extracting metadata: {e}", file=sys.stderr)
+            return None
+
+    @staticmethod
+    def _citation_key(metadata: dict) -> str:
+        """First author's last name, year and PMID, e.g. Smith2020pmid123."""
+        authors = metadata.get("authors")
+        if authors:
+            first_author = authors.split(" and ", 1)[0]
             if "," in first_author:
-                last_name = first_author.split(",")[0].strip()
+                last_name = first_author.split(",", 1)[0].strip()
             else:
                 last_name = first_author.split()[0]
         else:
             last_name = "Unknown"
 
         year = metadata.get("year", "XXXX")
-        citation_key = f'{last_name}{year}pmid{metadata.get("pmid", "")}'
-
-        # Build BibTeX entry
-        lines = [f"@article{{{citation_key},"]
+        return f'{last_name}{year}pmid{metadata.get("pmid", "")}'
 
+    def metadata_to_bibtex(self, metadata: dict) -> str:
+        """Convert metadata to BibTeX format."""
+        # One line per non-empty field; joining with ",\n" leaves no
+        # trailing comma to strip
+        fields = []
         if metadata.get("authors"):
-            lines.append(f'  author  = {{{metadata["authors"]}}},')
-
+            fields.append(f'  author  = {{{metadata["authors"]}}}')
         if metadata.get("title"):
-            lines.append(f'  title   = {{{metadata["title"]}}},')
-
+            fields.append(f'  title   = {{{metadata["title"]}}}')
         if metadata.get("journal"):
-            lines.append(f'  journal = {{{metadata["journal"]}}},')
-
+            fields.append(f'  journal = {{{metadata["journal"]}}}')
         if metadata.get("year"):
-            lines.append(f'  year    = {{{metadata["year"]}}},')
-
+            fields.append(f'  year    = {{{metadata["year"]}}}')
         if metadata.get("volume"):
-            lines.append(f'  volume  = {{{metadata["volume"]}}},')
-
+            fields.append(f'  volume  = {{{metadata["volume"]}}}')
         if metadata.get("issue"):
-            lines.append(f'  number  = {{{metadata["issue"]}}},')
-
+            fields.append(f'  number  = {{{metadata["issue"]}}}')
         if metadata.get("pages"):
             pages = metadata["pages"].replace("-", "--")
-            lines.append(f"  pages   = {{{pages}}},")
-
+            fields.append(f"  pages   = {{{pages}}}")
         if metadata.get("doi"):
-            lines.append(f'  doi     = {{{metadata["doi"]}}},')
-
+            fields.append(f'  doi     = {{{metadata["doi"]}}}')
         if metadata.get("pmid"):
-            lines.append(f'  note    = {{PMID: {metadata["pmid"]}}},')
-
-        # Remove trailing comma
-        if lines[-1].endswith(","):
-            lines[-1] = lines[-1][:-1]
-
-        lines.append("}")
+            fields.append(f'  note    = {{PMID: {metadata["pmid"]}}}')
 
-        return "\n".join(lines)
+        header = f"@article{{{self._citation_key(metadata)}"
+        if not fields:
+            return f"{header}\n}}"
+        return f"{header},\n" + ",\n".join(fields) + "\n}"
 
 
 def main():
@@ -291,6 +536,8 @@ def main():
 
     parser.add_argument("--email", help="Email for Entrez (or set NCBI_EMAIL env var)")
 
+    parser.add_argument("--no-cache", action="store_true", help=f"Do not read or write the metadata cache ({CACHE_DIR})")
+
     args = parser.parse_args()
 
     # Get query
@@ -314,30 +561,33 @@ def main():
         pub_types = [pt.strip() for pt in args.publication_types.split(",")]
 
     # Search PubMed
-    searcher = PubMedSearcher(api_key=args.api_key, email=args.email)
-    pmids = searcher.search(query, max_results=args.limit, date_start=args.date_start, date_end=args.date_end, publication_types=pub_types)
+    searcher = PubMedSearcher(api_key=args.api_key, email=args.email, use_cache=not args.no_cache)
+    try:
+        pmids = searcher.search(query, max_results=args.limit, date_start=args.date_start, date_end=args.date_end, publication_types=pub_types)
 
-    if not pmids:
-        print("No results found", file=sys.stderr)
-        sys.exit(1)
+        if not pmids:
+            print("No results found", file=sys.stderr)
+            sys.exit(1)
 
-    # Fetch metadata
-    metadata_list = searcher.fetch_metadata(pmids)
+        # Fetch metadata
+        metadata_list = searcher.fetch_metadata(pmids)
+    finally:
+        searcher.close()
 
-    # Format output
+    # Format output (as UTF-8 bytes, written without re-encoding)
     if args.format == "json":
-        output = json.dumps({"query": query, "count": len(metadata_list), "results": metadata_list}, indent=2)
+        output = _dumps_indented({"query": query, "count": len(metadata_list), "results": metadata_list})
     else:  # bibtex
         bibtex_entries = [searcher.metadata_to_bibtex(m) for m in metadata_list]
-        output = "\n\n".join(bibtex_entries) + "\n"
+        output = ("\n\n".join(bibtex_entries) + "\n").encode()
 
     # Write output
     if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
+        with open(args.output, "wb") as f:
             f.write(output)
         print(f"Wrote {len(metadata_list)} results to {args.output}", file=sys.stderr)
     else:
-        print(output)
+        sys.stdout.buffer.write(output + b"\n")
 
 
 if __name__ == "__main__":
@@ -5,20 +5,84 @@ Validate BibTeX files for accuracy, completeness, and format compliance.
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-import requests
+import httpx
+
+try:
+    from ._bibtex import read_entries
+    from ._common import HTTP2_AVAILABLE, RequestPacer, read_cache, send_with_retries, write_cache
+except ImportError:  # run as a script
+    from _bibtex import read_entries
+    from _common import HTTP2_AVAILABLE, RequestPacer, read_cache, send_with_retries, write_cache
+
+# Reports are serialized with orjson when it is installed
+try:
+    import orjson
+
+    def _dumps_indented(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+
+    def _dumps_indented(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+# DOIs that resolved are cached on disk with their CrossRef metadata (None
+# for DOIs registered with other agencies), so re-validating a bibliography
+# skips the network for them. Unknown and unverifiable DOIs are not cached,
+# so they are checked again next run.
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "aura" / "doi"
+CACHE_TTL = 90 * 24 * 3600  # seconds
+# Bump when the cached metadata dictionary changes shape
+CACHE_VERSION = 1
+
+# CrossRef's published limits as (requests per second, requests in flight):
+# anonymous clients share the public pool, clients sending a mailto get the
+# polite pool. X-Rate-Limit headers from the server override the rate.
+CROSSREF_HOST = "api.crossref.org"
+CROSSREF_PUBLIC_LIMITS = (5, 1)
+CROSSREF_POLITE_LIMITS = (10, 3)
+
+_YEAR_RE = re.compile(r"^\d{4}$")
+_DOI_RE = re.compile(r"^10\.\d{4,}/[^\s]+$")
+_PAGE_HYPHEN_RE = re.compile(r"\d-\d")
+_PUNCT_RE = re.compile(r"[^\w\s]")
 
 
 class CitationValidator:
     """Validate BibTeX entries for errors and inconsistencies."""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "CitationValidator/1.0 (Citation Management Tool)"})
+    def __init__(self, use_cache: bool = True, email: str | None = None):
+        """
+        Initialize validator.
+
+        Args:
+            use_cache: Read and write the on-disk DOI verification cache
+            email: Email for the CrossRef polite pool (recommended)
+        """
+        self.email = email or os.getenv("NCBI_EMAIL", "")
+        rate, self.doi_workers = CROSSREF_POLITE_LIMITS if self.email else CROSSREF_PUBLIC_LIMITS
+        # CrossRef requests from the verification workers are paced to the
+        # pool's rate; 429s and 5xx are retried after Retry-After or backoff
+        self._pacer = RequestPacer({CROSSREF_HOST: 1 / rate})
+        # One pooled client shared by the verification workers; over HTTP/2
+        # their CrossRef requests are multiplexed on a single connection
+        # instead of paying a TLS handshake each
+        self.client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=self.doi_workers, max_keepalive_connections=self.doi_workers),
+            timeout=10.0,
+            headers={"User-Agent": "CitationValidator/1.0 (Citation Management Tool)"},
+        )
+        self.use_cache = use_cache
 
         # Required fields by entry type
         self.required_fields = {
@@ -50,41 +114,58 @@ class CitationValidator:
             List of entry dictionaries
         """
         try:
-            with open(filepath, encoding="utf-8") as f:
-                content = f.read()
-        except Exception as e:
+            return list(self._read_entries(filepath))
+        except (OSError, ValueError) as e:
             print(f"Error reading file: {e}", file=sys.stderr)
             return []
 
-        entries = []
-
-        # Match BibTeX entries
-        pattern = r"@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}"
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-
-            # Parse fields
-            fields = {}
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-
-                fields[field_name] = field_value.strip()
-
-            entries.append({"type": entry_type, "key": citation_key, "fields": fields, "raw": match.group(0)})
+    def _read_entries(self, filepath: str):
+        """
+        Stream entries from a BibTeX file.
 
-        return entries
+        Entries with unbalanced braces or quotes are marked "malformed".
+        """
+        for entry_type, citation_key, fields, raw in read_entries(filepath):
+            entry = {"type": entry_type, "key": citation_key, "fields": fields or {}, "raw": raw}
+            if fields is None:
+                entry["malformed"] = True
+            yield entry
+
+    def close(self) -> None:
+        """Close the pooled HTTP client."""
+        self.client.close()
+
+    @staticmethod
+    def _cache_path(doi: str) -> Path:
+        """Cache file for a DOI (DOIs are case-insensitive)."""
+        return CACHE_DIR / hashlib.sha1(doi.lower().encode()).hexdigest()
+
+    def _cache_get(self, doi: str) -> tuple[bool, dict | None] | None:
+        """Return a cached verification result, or None if missing, expired or outdated."""
+        if not self.use_cache:
+            return None
+
+        raw = read_cache(self._cache_path(doi), CACHE_TTL)
+        if raw is None:
+            return None
+        try:
+            cached = json.loads(raw)
+        except ValueError:
+            return None
+        if cached.get("version") != CACHE_VERSION:
+            return None
+        return cached["valid"], cached["metadata"]
+
+    def _cache_put(self, doi: str, is_valid: bool, metadata: dict | None) -> None:
+        """Store a verification result (best effort, atomic)."""
+        if not self.use_cache:
+            return
+
+        record = json.dumps({"version": CACHE_VERSION, "valid": is_valid, "metadata": metadata}).encode()
+        try:
+            write_cache(self._cache_path(doi), record)
+        except OSError as e:
+            print(f"Warning: Could not write cache for DOI {doi}: {e}", file=sys.stderr)
 
     def validate_entry(self, entry: dict) -> tuple[list[dict], list[dict]]:
         """
@@ -103,35 +184,48 @@ class CitationValidator:
         key = entry["key"]
         fields = entry["fields"]
 
+        # Fields of a malformed entry cannot be trusted; report it alone
+        if entry.get("malformed"):
+            errors.append(
+                {
+                    "type": "malformed_entry",
+                    "severity": "high",
+                    "message": f"Entry {key}: Unbalanced braces or quotes",
+                }
+            )
+            return errors, warnings
+
         # Check required fields
-        if entry_type in self.required_fields:
-            for req_field in self.required_fields[entry_type]:
-                if req_field not in fields or not fields[req_field]:
-                    # Special case: book can have author OR editor
-                    if entry_type == "book" and req_field == "author":
-                        if "editor" not in fields or not fields["editor"]:
-                            errors.append(
-                                {
-                                    "type": "missing_required_field",
-                                    "field": "author or editor",
-                                    "severity": "high",
-                                    "message": f'Entry {key}: Missing required field "author" or "editor"',
-                                }
-                            )
-                    else:
-                        errors.append(
-                            {
-                                "type": "missing_required_field",
-                                "field": req_field,
-                                "severity": "high",
-                                "message": f'Entry {key}: Missing required field "{req_field}"',
-                            }
-                        )
+        required = self.required_fields.get(entry_type)
+        if required:
+            for req_field in required:
+                if fields.get(req_field):
+                    continue
+                if entry_type != "book" or req_field != "author":
+                    errors.append(
+                        {
+                            "type": "missing_required_field",
+                            "field": req_field,
+                            "severity": "high",
+                            "message": f'Entry {key}: Missing required field "{req_field}"',
+                        }
+                    )
+                # Special case: book can have author OR editor
+                elif not fields.get("editor"):
+                    errors.append(
+                        {
+                            "type": "missing_required_field",
+                            "field": "author or editor",
+                            "severity": "high",
+                            "message": f'Entry {key}: Missing required field "author" or "editor"',
+                        }
+                    )
 
         # Check recommended fields
-        if entry_type in self.recommended_fields:
-            for rec_field in self.recommended_fields[entry_type]:
-                if rec_field not in fields or not fields[rec_field]:
+        recommended = self.recommended_fields.get(entry_type)
+        if recommended:
+            for rec_field in recommended:
+                if not fields.get(rec_field):
                     warnings.append(
                         {
                             "type": "missing_recommended_field",
@@ -141,10 +235,10 @@ class CitationValidator:
                         }
                     )
 
-        # Validate year
-        if "year" in fields:
-            year = fields["year"]
-            if not re.match(r"^\d{4}$", year):
+        # Validate year (present but empty still counts as invalid)
+        year = fields.get("year")
+        if year is not None:
+            if not _YEAR_RE.match(year):
                 errors.append(
                     {
                         "type": "invalid_year",
@@ -154,7 +248,7 @@ class CitationValidator:
                         "message": f'Entry {key}: Invalid year format "{year}" (should be 4 digits)',
                     }
                 )
-            elif int(year) < 1600 or int(year) > 2030:
+            elif not 1600 <= int(year) <= 2030:
                 warnings.append(
                     {
                         "type": "suspicious_year",
@@ -166,9 +260,9 @@ class CitationValidator:
                 )
 
         # Validate DOI format
-        if "doi" in fields:
-            doi = fields["doi"]
-            if not re.match(r"^10\.\d{4,}/[^\s]+$", doi):
+        doi = fields.get("doi")
+        if doi is not None:
+            if not _DOI_RE.match(doi):
                 warnings.append(
                     {
                         "type": "invalid_doi_format",
@@ -180,71 +274,93 @@ class CitationValidator:
                 )
 
         # Check for single hyphen in pages (should be --)
-        if "pages" in fields:
-            pages = fields["pages"]
-            if re.search(r"\d-\d", pages) and "--" not in pages:
-                warnings.append(
-                    {
-                        "type": "page_range_format",
-                        "field": "pages",
-                        "value": pages,
-                        "severity": "low",
-                        "message": f"Entry {key}: Page range uses single hyphen, should use -- (en-dash)",
-                    }
-                )
+        # (the substring test is cheaper than the regex, so it goes first)
+        pages = fields.get("pages")
+        if pages and "--" not in pages and _PAGE_HYPHEN_RE.search(pages):
+            warnings.append(
+                {
+                    "type": "page_range_format",
+                    "field": "pages",
+                    "value": pages,
+                    "severity": "low",
+                    "message": f"Entry {key}: Page range uses single hyphen, should use -- (en-dash)",
+                }
+            )
 
         # Check author format
-        if "author" in fields:
-            author = fields["author"]
-            if ";" in author or "&" in author:
-                errors.append(
-                    {
-                        "type": "invalid_author_format",
-                        "field": "author",
-                        "severity": "high",
-                        "message": f'Entry {key}: Authors should be separated by " and ", not ";" or "&"',
-                    }
-                )
+        author = fields.get("author")
+        if author and (";" in author or "&" in author):
+            errors.append(
+                {
+                    "type": "invalid_author_format",
+                    "field": "author",
+                    "severity": "high",
+                    "message": f'Entry {key}: Authors should be separated by " and ", not ";" or "&"',
+                }
+            )
 
         return errors, warnings
 
-    def verify_doi(self, doi: str) -> tuple[bool, dict | None]:
+    def verify_doi(self, doi: str) -> tuple[bool | None, dict | None]:
         """
-        Verify DOI resolves correctly and get metadata.
+        Verify DOI is registered and get its CrossRef metadata.
 
         Args:
             doi: Digital Object Identifier
 
         Returns:
-            Tuple of (is_valid, metadata)
+            Tuple of (is_valid, metadata); metadata is None for DOIs
+            registered with another agency, and is_valid is None when no
+            definite answer could be had
         """
+        cached = self._cache_get(doi)
+        if cached is not None:
+            return cached
+
+        # One CrossRef lookup both checks the DOI exists (200 vs 404) and
+        # returns its metadata; transient failures are retried while sending
+        params = {"mailto": self.email} if self.email else None
+        request = self.client.build_request("GET", f"https://{CROSSREF_HOST}/works/{doi}", params=params)
         try:
-            url = f"https://doi.org/{doi}"
-            response = self.session.head(url, timeout=10, allow_redirects=True)
-
-            if response.status_code < 400:
-                # DOI resolves, now get metadata from CrossRef
-                crossref_url = f"https://api.crossref.org/works/{doi}"
-                metadata_response = self.session.get(crossref_url, timeout=10)
-
-                if metadata_response.status_code == 200:
-                    data = metadata_response.json()
-                    message = data.get("message", {})
-
-                    # Extract key metadata
-                    metadata = {
-                        "title": message.get("title", [""])[0],
-                        "year": self._extract_year_crossref(message),
-                        "authors": self._format_authors_crossref(message.get("author", [])),
-                    }
-                    return True, metadata
-                else:
-                    return True, None  # DOI resolves but no CrossRef metadata
-            else:
-                return False, None
+            response = send_with_retries(self.client, request, self._pacer)
+            if response.status_code == 404:
+                # Not a CrossRef DOI, but DataCite and the other agencies
+                # register DOIs too: ask the resolver whether it exists
+                return self._resolve_doi(doi)
+            if response.status_code != 200:
+                return None, None
+            message = response.json().get("message", {})
+
+            # Extract key metadata (CrossRef may send empty lists or omit fields)
+            metadata = {
+                "title": (message.get("title") or [""])[0],
+                "year": self._extract_year_crossref(message),
+                "authors": self._format_authors_crossref(message.get("author") or []),
+            }
+        except (httpx.HTTPError, ValueError, LookupError, TypeError, AttributeError):
+            return None, None
+
+        self._cache_put(doi, True, metadata)
+        return True, metadata
+
+    def _resolve_doi(self, doi: str) -> tuple[bool | None, None]:
+        """
+        Check that doi.org knows a DOI, without CrossRef metadata.
 
-        except Exception:
+        The resolver's own answer is used (a redirect or 404) rather than
+        following it to the publisher, whose site may refuse HEAD requests.
+        """
+        request = self.client.build_request("HEAD", f"https://doi.org/{doi}")
+        try:
+            response = send_with_retries(self.client, request, self._pacer)
+        except httpx.HTTPError:
+            return None, None
+        if response.status_code == 404:
             return False, None
+        if response.status_code >= 400:
+            return None, None
+        self._cache_put(doi, True, None)
+        return True, None
 
     def detect_duplicates(self, entries: list[dict]) -> list[dict]:
         """
@@ -258,13 +374,44 @@ class CitationValidator:
         """
         duplicates = []
 
-        # Check for duplicate DOIs
+        # One pass collects DOIs, key counts and title matches; the three
+        # kinds of duplicate are then reported in that order
         doi_map = defaultdict(list)
+        key_counts = defaultdict(int)
+        titles = {}
+        title_duplicates = []
+
         for entry in entries:
-            doi = entry["fields"].get("doi", "").strip()
+            key = entry["key"]
+            fields = entry["fields"]
+            key_counts[key] += 1
+
+            doi = fields.get("doi")
             if doi:
-                doi_map[doi].append(entry["key"])
+                doi = doi.strip()
+                if doi:
+                    doi_map[doi].append(key)
+
+            # Check for similar titles (possible duplicates)
+            title = fields.get("title")
+            if title:
+                title = _PUNCT_RE.sub("", title.lower())  # Remove punctuation
+                title = " ".join(title.split())  # Normalize whitespace
+
+            if title:
+                if title in titles:
+                    title_duplicates.append(
+                        {
+                            "type": "similar_title",
+                            "entries": [titles[title], key],
+                            "severity": "medium",
+                            "message": f'Possible duplicate: "{titles[title]}" and "{key}" have identical titles',
+                        }
+                    )
+                else:
+                    titles[title] = key
 
+        # Duplicate DOIs
         for doi, keys in doi_map.items():
             if len(keys) > 1:
                 duplicates.append(
@@ -277,11 +424,7 @@ class CitationValidator:
                     }
                 )
 
-        # Check for duplicate citation keys
-        key_counts = defaultdict(int)
-        for entry in entries:
-            key_counts[entry["key"]] += 1
-
+        # Duplicate citation keys
         for key, count in key_counts.items():
             if count > 1:
                 duplicates.append(
@@ -294,26 +437,7 @@ class CitationValidator:
                     }
                 )
 
-        # Check for similar titles (possible duplicates)
-        titles = {}
-        for entry in entries:
-            title = entry["fields"].get("title", "").lower()
-            title = re.sub(r"[^\w\s]", "", title)  # Remove punctuation
-            title = " ".join(title.split())  # Normalize whitespace
-
-            if title:
-                if title in titles:
-                    duplicates.append(
-                        {
-                            "type": "similar_title",
-                            "entries": [titles[title], entry["key"]],
-                            "severity": "medium",
-                            "message": f'Possible duplicate: "{titles[title]}" and "{entry["key"]}" have identical titles',
-                        }
-                    )
-                else:
-                    titles[title] = entry["key"]
-
+        duplicates.extend(title_duplicates)
         return duplicates
 
     def validate_file(self, filepath: str, check_dois: bool = False) -> dict:
@@ -359,13 +483,25 @@ class CitationValidator:
         doi_errors = []
         if check_dois:
             print("Verifying DOIs...", file=sys.stderr)
-            for i, entry in enumerate(entries):
-                doi = entry["fields"].get("doi", "")
-                if doi:
-                    print(f"Verifying DOI {i+1}: {doi}", file=sys.stderr)
-                    is_valid, metadata = self.verify_doi(doi)
+            to_verify = [(i, entry, entry["fields"]["doi"]) for i, entry in enumerate(entries) if entry["fields"].get("doi", "")]
+
+            # Verifications are independent network round trips: run as many
+            # at once as CrossRef allows and collect the results in entry order
+            with ThreadPoolExecutor(max_workers=self.doi_workers) as executor:
+                results = executor.map(lambda item: self._verify_entry_doi(item[0] + 1, item[2]), to_verify)
 
-                    if not is_valid:
+                for (_, entry, doi), (is_valid, metadata) in zip(to_verify, results):
+                    if is_valid is None:
+                        all_warnings.append(
+                            {
+                                "type": "unverified_doi",
+                                "entry": entry["key"],
+                                "doi": doi,
+                                "severity": "medium",
+                                "message": f'Entry {entry["key"]}: Could not verify DOI with CrossRef: {doi}',
+                            }
+                        )
+                    elif not is_valid:
                         doi_errors.append(
                             {
                                 "type": "invalid_doi",
@@ -387,6 +523,12 @@ class CitationValidator:
             "duplicates": duplicates,
         }
 
+    def _verify_entry_doi(self, number: int, doi: str) -> tuple[bool | None, dict | None]:
+        """Report progress and verify one entry's DOI (runs on a worker thread)."""
+        # One write per line so concurrent workers don't interleave output
+        sys.stderr.write(f"Verifying DOI {number}: {doi}\n")
+        return self.verify_doi(doi)
+
     def _extract_year_crossref(self, message: dict) -> str:
         """Extract year from CrossRef message."""
         date_parts = message.get("published-print", {}).get("date-parts", [[]])
@@ -431,11 +573,18 @@ def main():
 
     parser.add_argument("--verbose", action="store_true", help="Show detailed output")
 
+    parser.add_argument("--email", help="Email for the CrossRef polite pool (default: $NCBI_EMAIL)")
+
+    parser.add_argument("--no-cache", action="store_true", help=f"Do not read or write the DOI verification cache ({CACHE_DIR})")
+
     args = parser.parse_args()
 
     # Validate file
-    validator = CitationValidator()
-    report = validator.validate_file(args.file, check_dois=args.check_dois)
+    validator = CitationValidator(use_cache=not args.no_cache, email=args.email)
+    try:
+        report = validator.validate_file(args.file, check_dois=args.check_dois)
+    finally:
+        validator.close()
 
     # Print summary
     print("\n" + "=" * 60)
@@ -477,8 +626,8 @@ def main():
 
     # Save report
     if args.report:
-        with open(args.report, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2)
+        with open(args.report, "wb") as f:
+            f.write(_dumps_indented(report))
         print(f"\nDetailed report saved to: {args.report}")
 
     # Exit with error code if there are errors
@@ -0,0 +1,83 @@
+"""
+Tests for the async citation API clients.
+"""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+PUBMED_ARTICLE = """
+<PubmedArticle>
+  <MedlineCitation>
+    <PMID>123</PMID>
+    <Article>
+      <Journal><Title>Nature</Title></Journal>
+      <ArticleTitle>Role of <i>TP53</i> in H<sub>2</sub>O stress</ArticleTitle>
+      <Abstract><AbstractText>We show <b>strong</b> effects.</AbstractText></Abstract>
+    </Article>
+  </MedlineCitation>
+</PubmedArticle>
+"""
+
+
+class TestPubMedParsing:
+    """PubMed records parse the same with and without lxml."""
+
+    @pytest.mark.parametrize("use_lxml", [True, False], ids=["lxml", "elementtree"])
+    def test_inline_markup_kept(self, monkeypatch, use_lxml):
+        from agent.tools.citation_management import citation_api
+
+        if use_lxml:
+            if citation_api.LET is None:
+                pytest.skip("lxml is not installed")
+            article = citation_api.LET.fromstring(PUBMED_ARTICLE)
+        else:
+            monkeypatch.setattr(citation_api, "LET", None)
+            article = ET.fromstring(PUBMED_ARTICLE)
+        client = citation_api.PubMedClient(http_client=None)
+
+        paper = client._parse_article(article)
+
+        assert paper.title == "Role of TP53 in H2O stress"
+        assert paper.abstract == "We show strong effects."
+        assert paper.pmid == "123"
+
+
+SCHOLAR_PAGE = """
+<html><body>
+  <div class="gs_ri">
+    <h3 class="gs_rt"><a href="https://example.org/paper">Attention Is All You Need</a></h3>
+    <div class="gs_a">A Vaswani, N Shazeer - Advances in neural information processing systems, 2017 - example.org</div>
+  </div>
+</body></html>
+"""
+
+
+class TestGoogleScholarClient:
+    """Scholar searches go through the clients the caller provides."""
+
+    def test_search_uses_injected_client(self, tmp_path, monkeypatch):
+        import asyncio
+
+        import httpx
+
+        from agent.tools.citation_management import citation_api
+
+        monkeypatch.setattr(citation_api, "_SCHOLAR_CACHE_DIR", tmp_path)
+        monkeypatch.setattr(citation_api.GoogleScholarClient, "_result_cache", {})
+        monkeypatch.setattr(citation_api.GoogleScholarClient, "_min_request_interval", 0.0)
+        requests = []
+
+        async def handler(request):
+            requests.append(request)
+            return httpx.Response(200, text=SCHOLAR_PAGE)
+
+        async def search():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+                return await citation_api.GoogleScholarClient(http_client).search("attention")
+
+        results = asyncio.run(search())
+
+        assert [paper.title for paper in results] == ["Attention Is All You Need"]
+        assert len(requests) == 1
+        assert requests[0].headers["User-Agent"] == citation_api.GoogleScholarClient.HEADERS["User-Agent"]
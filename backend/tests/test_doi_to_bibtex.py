@@ -0,0 +1,182 @@
+"""
+Tests for the DOI to BibTeX converter script.
+"""
+
+
+class TestWorkToBibtex:
+    """CrossRef work records are written as valid BibTeX."""
+
+    WORK = {
+        "DOI": "10.1000/a_b%1",
+        "type": "journal-article",
+        "title": ["Growth of <i>E. coli</i> at 50% {O<sub>2</sub>} &amp; more"],
+        "author": [{"given": "Ana", "family": "García_López"}],
+        "container-title": ["Journal of R&D"],
+        "published-print": {"date-parts": [[2021, 3]]},
+        "page": "10-20",
+    }
+
+    def test_markup_stripped_and_specials_escaped(self):
+        from agent.tools.citation_management.doi_to_bibtex import DOIConverter
+
+        converter = DOIConverter(use_cache=False)
+        try:
+            bibtex = converter._work_to_bibtex(self.WORK)
+        finally:
+            converter.close()
+
+        assert bibtex == (
+            "@article{GarcíaLópez2021,\n"
+            "  author    = {García\\_López, Ana},\n"
+            "  title     = {Growth of E. coli at 50\\% \\{O2\\} \\& more},\n"
+            "  journal   = {Journal of R\\&D},\n"
+            "  year      = {2021},\n"
+            "  pages     = {10--20},\n"
+            "  doi       = {10.1000/a_b%1}\n"
+            "}"
+        )
+
+
+def _work(doi: str) -> dict:
+    """A minimal CrossRef work record."""
+    return {"DOI": doi, "type": "journal-article", "title": [f"Title {doi}"], "author": [{"family": "Smith"}]}
+
+
+def _crossref_handler(requests: list):
+    """MockTransport handler answering CrossRef filter queries for known DOIs."""
+    import httpx
+
+    def handler(request):
+        if request.url.host == "doi.org":
+            return httpx.Response(404)
+        requests.append(request)
+        dois = [term.removeprefix("doi:") for term in request.url.params["filter"].split(",")]
+        items = [_work(doi) for doi in dois if not doi.endswith("missing")]
+        return httpx.Response(200, json={"message": {"items": items}})
+
+    return handler
+
+
+class TestBatchConversion:
+    """DOIs are converted in batches through the filter API."""
+
+    def test_convert_multiple_batches(self):
+        import httpx
+
+        from agent.tools.citation_management.doi_to_bibtex import DOIConverter
+
+        requests = []
+        client = httpx.Client(transport=httpx.MockTransport(_crossref_handler(requests)))
+        converter = DOIConverter(use_cache=False, http_client=client)
+        dois = [f"10.1000/{i}" for i in range(45)] + ["10.1000/missing"]
+
+        entries = converter.convert_multiple(dois, max_concurrency=2)
+
+        assert len(entries) == 45
+        assert all("Title 10.1000/" in entry for entry in entries)
+        # Input order is kept across batches
+        assert "10.1000/0}" in entries[0] and "10.1000/44}" in entries[-1]
+        assert sorted(len(request.url.params["filter"].split(",")) for request in requests) == [6, 20, 20]
+
+    def test_convert_multiple_inside_event_loop(self):
+        import asyncio
+
+        import httpx
+
+        from agent.tools.citation_management.doi_to_bibtex import DOIConverter
+
+        requests = []
+        client = httpx.Client(transport=httpx.MockTransport(_crossref_handler(requests)))
+        converter = DOIConverter(use_cache=False, http_client=client)
+
+        async def convert():
+            return converter.convert_multiple(["10.1000/a", "10.1000/b"])
+
+        assert len(asyncio.run(convert())) == 2
+
+    def test_deprecated_delay_accepted(self):
+        import httpx
+
+        from agent.tools.citation_management.doi_to_bibtex import DOIConverter
+
+        requests = []
+        client = httpx.Client(transport=httpx.MockTransport(_crossref_handler(requests)))
+        converter = DOIConverter(use_cache=False, http_client=client)
+
+        assert len(converter.convert_multiple(["10.1000/a", "10.1000/b"], 0.5)) == 2
+        assert len(converter.convert_multiple(["10.1000/a"], delay=1.0)) == 1
+
+
+class TestSingleDoi:
+    """The single-DOI path over an injected httpx.Client."""
+
+    def test_retries_rate_limit(self):
+        import httpx
+
+        from agent.tools.citation_management.doi_to_bibtex import DOIConverter
+
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if len(requests) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"message": _work("10.1000/x")})
+
+        converter = DOIConverter(use_cache=False, http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+        bibtex = converter.doi_to_bibtex("https://doi.org/10.1000/x")
+
+        assert bibtex.startswith("@article{")
+        assert str(requests[-1].url) == "https://api.crossref.org/works/10.1000/x"
+        assert len(requests) == 2
+
+    def test_not_found(self):
+        import httpx
+
+        from agent.tools.citation_management.doi_to_bibtex import DOIConverter
+
+        client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+        converter = DOIConverter(use_cache=False, http_client=client)
+
+        assert converter.doi_to_bibtex("10.1000/missing") is None
+
+    def test_datacite_doi_resolved_through_doi_org(self):
+        import httpx
+
+        from agent.tools.citation_management.doi_to_bibtex import DOIConverter
+
+        datacite = "@data{arxiv_2101.00001,\n  title = {A Preprint},\n  year = {2021}\n}"
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if request.url.host == "doi.org":
+                return httpx.Response(200, text=datacite)
+            return httpx.Response(404)
+
+        converter = DOIConverter(use_cache=False, http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+        bibtex = converter.doi_to_bibtex("10.48550/arXiv.2101.00001")
+
+        assert bibtex.startswith("@misc{arxiv_2101.00001,")
+        assert str(requests[-1].url) == "https://doi.org/10.48550/arXiv.2101.00001"
+        assert requests[-1].headers["Accept"] == "application/x-bibtex"
+
+    def test_datacite_doi_in_batch(self):
+        import httpx
+
+        from agent.tools.citation_management.doi_to_bibtex import DOIConverter
+
+        def handler(request):
+            if request.url.host == "doi.org":
+                return httpx.Response(200, text="@misc{zenodo, title = {Dataset}}")
+            # CrossRef leaves the DataCite DOI out of the batch
+            return httpx.Response(200, json={"message": {"items": [_work("10.1000/a")]}})
+
+        converter = DOIConverter(use_cache=False, http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+        entries = converter.convert_multiple(["10.5281/zenodo.123", "10.1000/a"])
+
+        assert entries[0] == "@misc{zenodo, title = {Dataset}}"
+        assert "Title 10.1000/a" in entries[1]
@@ -0,0 +1,53 @@
+"""
+Tests for the metadata extractor script.
+"""
+
+EFETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+
+
+def _extractor(handler):
+    """An extractor whose requests go to handler instead of the network."""
+    import httpx
+
+    from agent.tools.citation_management.extract_metadata import MetadataExtractor
+
+    extractor = MetadataExtractor(email="test@example.org", use_cache=False)
+    extractor.client.close()
+    extractor.client = httpx.Client(transport=httpx.MockTransport(handler))
+    return extractor
+
+
+class TestPubMedBatch:
+    """EFetch batches are parsed article by article."""
+
+    def test_article_without_citation_skipped(self):
+        import httpx
+
+        xml = (
+            b"<PubmedArticleSet>"
+            b"<PubmedArticle><PubmedData/></PubmedArticle>"
+            b"<PubmedArticle><MedlineCitation><PMID>2</PMID><Article>"
+            b"<Journal><Title>J</Title></Journal><ArticleTitle>Kept</ArticleTitle>"
+            b"</Article></MedlineCitation></PubmedArticle>"
+            b"</PubmedArticleSet>"
+        )
+        extractor = _extractor(lambda request: httpx.Response(200, content=xml))
+
+        results = extractor.extract_from_pmids(["1", "2"])
+
+        assert list(results) == ["2"]
+        assert results["2"]["title"] == "Kept"
+        assert results["2"]["journal"] == "J"
+
+    def test_host_slot_held_while_streaming(self):
+        import threading
+
+        import httpx
+
+        extractor = _extractor(lambda request: httpx.Response(200, content=b"<PubmedArticleSet/>"))
+        slot = extractor._host_limits["eutils.ncbi.nlm.nih.gov"] = threading.Semaphore(1)
+
+        with extractor._stream("GET", EFETCH_URL) as response:
+            assert not slot.acquire(blocking=False)
+            response.read()
+        assert slot.acquire(blocking=False)
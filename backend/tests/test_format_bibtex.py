@@ -0,0 +1,92 @@
+"""
+Tests for the BibTeX formatter script.
+"""
+
+import shutil
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class TestMalformedEntries:
+    """An entry with unbalanced braces must not absorb the entries after it."""
+
+    def test_scan_stops_at_next_entry(self):
+        from agent.tools.citation_management._bibtex import scan_entries
+
+        content = (FIXTURES / "unbalanced_braces.bib").read_text()
+        entries = [(key, fields) for _, key, fields, _, _ in scan_entries(content)]
+
+        assert [key for key, _ in entries] == ["first", "second", "third"]
+        assert entries[0][1] is None
+        assert entries[1][1] == {"author": "B. Author", "title": "Second", "year": "2021"}
+
+    def test_unterminated_last_entry(self):
+        from agent.tools.citation_management._bibtex import scan_entries
+
+        content = "@misc{done, title = {x}}\n@book{open,\n  title = {never closed\n"
+
+        assert [(key, fields) for _, key, fields, _, _ in scan_entries(content)] == [("done", {"title": "x"}), ("open", None)]
+        # A streaming caller waits for more input instead
+        assert [key for _, key, _, _, _ in scan_entries(content, final=False)] == ["done"]
+
+    def test_format_in_place_keeps_every_entry(self, tmp_path):
+        from agent.tools.citation_management.format_bibtex import BibTeXFormatter
+
+        bib = tmp_path / "refs.bib"
+        shutil.copy(FIXTURES / "unbalanced_braces.bib", bib)
+        BibTeXFormatter(use_cache=False).format_file(str(bib))
+
+        output = bib.read_text()
+        for key in ("first", "second", "third"):
+            assert f"@article{{{key}," in output
+        # The malformed entry is written back as it was
+        assert "  title = {Missing close brace,\n  year = {2020}\n}" in output
+
+    def test_streaming_matches_whole_file(self, monkeypatch):
+        from agent.tools.citation_management import _bibtex
+
+        bib = str(FIXTURES / "unbalanced_braces.bib")
+        whole = list(_bibtex.read_entries(bib))
+
+        monkeypatch.setattr(_bibtex, "READ_BLOCK_SIZE", 7)
+        assert list(_bibtex.read_entries(bib)) == whole
+
+    def test_unbalanced_quote_and_comment(self):
+        from agent.tools.citation_management._bibtex import scan_entries
+
+        content = (
+            '@misc{quoted, title = "never closed}\n'
+            "@comment{ an open brace {\n"
+            "@misc{after, title = {Kept}}\n"
+        )
+
+        entries = [(key, fields) for _, key, fields, _, _ in scan_entries(content)]
+
+        assert entries == [("quoted", None), ("after", {"title": "Kept"})]
+
+    def test_sorted_output_keeps_malformed_entry(self, tmp_path):
+        from agent.tools.citation_management.format_bibtex import BibTeXFormatter
+
+        bib = tmp_path / "refs.bib"
+        shutil.copy(FIXTURES / "unbalanced_braces.bib", bib)
+        output = tmp_path / "sorted.bib"
+        BibTeXFormatter(use_cache=False).format_file(str(bib), output=str(output), deduplicate=True, sort_by="year")
+
+        text = output.read_text()
+        # Without parsed fields the malformed entry sorts as having no year
+        positions = [text.index(f"@article{{{key},") for key in ("second", "third", "first")]
+        assert positions == sorted(positions)
+        assert "title = {Missing close brace," in text
+
+
+class TestUnreadableInput:
+    """A missing input is reported and skipped, not turned into an exit."""
+
+    def test_missing_file(self, tmp_path, capsys):
+        from agent.tools.citation_management.format_bibtex import BibTeXFormatter
+
+        BibTeXFormatter(use_cache=False).format_file(str(tmp_path / "missing.bib"))
+
+        assert "No entries found" in capsys.readouterr().err
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,122 @@
+"""
+Tests for the citation validator script.
+"""
+
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class TestMalformedEntries:
+    """Malformed entries are reported without swallowing their neighbours."""
+
+    def test_unbalanced_braces_reported(self):
+        from agent.tools.citation_management.validate_citations import CitationValidator
+
+        validator = CitationValidator(use_cache=False)
+        try:
+            report = validator.validate_file(str(FIXTURES / "unbalanced_braces.bib"))
+        finally:
+            validator.close()
+
+        assert report["total_entries"] == 3
+        malformed = [error for error in report["errors"] if error["type"] == "malformed_entry"]
+        assert [error["entry"] for error in malformed] == ["first"]
+
+
+def _validator(handler, email="test@example.org"):
+    """A validator whose CrossRef requests go to handler instead of the network."""
+    import httpx
+
+    from agent.tools.citation_management.validate_citations import CitationValidator
+
+    validator = CitationValidator(use_cache=False, email=email)
+    validator.client.close()
+    validator.client = httpx.Client(transport=httpx.MockTransport(handler))
+    return validator
+
+
+class TestVerifyDoi:
+    """DOI verification against a mocked CrossRef."""
+
+    WORK = {"message": {"title": ["A Title"], "published-print": {"date-parts": [[2020]]}, "author": [{"given": "A", "family": "Author"}]}}
+
+    def test_rate_limited_then_found(self):
+        import httpx
+
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if len(requests) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json=self.WORK)
+
+        validator = _validator(handler)
+        is_valid, metadata = validator.verify_doi("10.1000/xyz")
+
+        assert is_valid is True
+        assert metadata == {"title": "A Title", "year": "2020", "authors": "Author, A"}
+        assert len(requests) == 2
+        # Requests identify themselves for CrossRef's polite pool
+        assert requests[0].url.params["mailto"] == "test@example.org"
+
+    def test_rate_limited_throughout_is_unverified(self):
+        import httpx
+
+        from agent.tools.citation_management._common import MAX_RETRIES
+
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+
+        validator = _validator(handler)
+
+        assert validator.verify_doi("10.1000/xyz") == (None, None)
+        assert len(requests) == MAX_RETRIES + 1
+
+    def test_concurrency_follows_pool(self, monkeypatch):
+        import httpx
+
+        monkeypatch.delenv("NCBI_EMAIL", raising=False)
+
+        def handler(request):
+            return httpx.Response(404)
+
+        assert _validator(handler).doi_workers == 3
+        assert _validator(handler, email="").doi_workers == 1
+
+    def test_datacite_doi_resolves(self):
+        import httpx
+
+        def handler(request):
+            if request.url.host == "api.crossref.org":
+                return httpx.Response(404)
+            assert request.method == "HEAD"
+            return httpx.Response(302, headers={"Location": "https://arxiv.org/abs/2101.00001"})
+
+        validator = _validator(handler)
+
+        assert validator.verify_doi("10.48550/arXiv.2101.00001") == (True, None)
+
+    def test_unknown_doi_is_invalid(self):
+        import httpx
+
+        def handler(request):
+            return httpx.Response(404)
+
+        validator = _validator(handler)
+
+        assert validator.verify_doi("10.1000/missing") == (False, None)
+
+    def test_empty_title_and_dates(self):
+        import httpx
+
+        def handler(request):
+            return httpx.Response(200, json={"message": {"title": [], "published-print": {"date-parts": [[]]}, "author": None}})
+
+        validator = _validator(handler)
+
+        assert validator.verify_doi("10.1000/untitled") == (True, {"title": "", "year": "", "authors": ""})